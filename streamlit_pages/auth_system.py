@@ -168,6 +168,11 @@ def check_subscription(user_id):
         st.error(f"Error checking subscription: {str(e)}")
         return None
 
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_check_subscription(user_id):
+    """Look up the user's active subscription, reusing the result across reruns for a minute"""
+    return check_subscription(user_id)
+
 def create_subscription(user_id, plan, payment_id, amount):
     """Create a new subscription for user"""
     supabase = get_supabase_client()
@@ -203,6 +208,8 @@ def create_subscription(user_id, plan, payment_id, amount):
         # Use secure query builder to prevent SQL injection
         secure_query = SecureQueryBuilder(supabase, "subscriptions")
         response = secure_query.insert(subscription_data).execute()
+        # The user's plan changed; drop the cached lookup so the next rerun sees it
+        cached_check_subscription.clear()
         return response.data[0] if response.data else None
     except Exception as e:
         st.error(f"Error creating subscription: {str(e)}")
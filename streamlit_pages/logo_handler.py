@@ -4,6 +4,7 @@ This module provides functionality for displaying logos in the application.
 """
 import streamlit as st
 import base64
+import os
 from pathlib import Path
 
 # Logo data will be embedded directly in the code
@@ -71,3 +72,38 @@ def display_logo(logo_type="dark", width=250):
     """
     
     st.markdown(html, unsafe_allow_html=True)
+
+# Logo files by theme, in order of preference
+_LOGO_CANDIDATES = {
+    "light": ("Owaiken_Black.svg", "Owaiken_Black.png"),
+    "dark": ("Owaiken_White.svg", "Owaiken_White.png"),
+}
+
+@st.cache_data(show_spinner=False)
+def resolve_logo_paths(public_dir):
+    """
+    Find the uploaded logo files for both themes.
+    
+    The directory is listed once and the result cached, so reruns do not
+    touch the file system; saving a logo clears the cache.
+    
+    Args:
+        public_dir: Directory holding the logo files
+    
+    Returns:
+        (light_logo_path, dark_logo_path), each None if no usable file exists
+    """
+    try:
+        with os.scandir(public_dir) as entries:
+            sizes = {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+    except OSError:
+        return None, None
+    
+    paths = []
+    for logo_type in ("light", "dark"):
+        # SVG is preferred over PNG; files of 10 bytes or less are empty
+        # placeholders, which means no logo for this theme
+        name = next((name for name in _LOGO_CANDIDATES[logo_type] if name in sizes), None)
+        paths.append(os.path.join(public_dir, name) if name and sizes[name] > 10 else None)
+    
+    return tuple(paths)
@@ -6,6 +6,7 @@ import streamlit as st
 import os
 import base64
 from streamlit_pages.file_uploader_styles import apply_file_uploader_styles
+from streamlit_pages.logo_handler import resolve_logo_paths
 
 def logo_uploader_tab():
     """
@@ -159,7 +160,10 @@ def save_logo(uploaded_file, base_name):
     file_path = os.path.join(public_dir, f"{base_name}.{file_extension}")
     with open(file_path, "wb") as f:
         f.write(uploaded_file.getbuffer())
-        
+    
+    # Let the sidebar pick up the new logo
+    resolve_logo_paths.clear()
+    
     return file_path
 
 def save_svg_content(svg_content, filename):
@@ -181,7 +185,10 @@ def save_svg_content(svg_content, filename):
     file_path = os.path.join(public_dir, filename)
     with open(file_path, "w") as f:
         f.write(svg_content)
-        
+    
+    # Let the sidebar pick up the new logo
+    resolve_logo_paths.clear()
+    
     return file_path
 
 def find_logo(base_name):
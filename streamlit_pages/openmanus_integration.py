@@ -8,10 +8,13 @@ import subprocess
 import json
 import requests
 import tempfile
+import shutil
 import sys
 from pathlib import Path
-import toml
+import tomllib
+import tomli_w
 import time
+from functools import lru_cache
 from streamlit_pages.openmanus_dark_ui import apply_dark_theme, computer_svg, microphone_svg, reconnect_svg, fullscreen_svg
 from streamlit_pages.magic_ai_voice import apply_magic_voice_styles, magic_ai_voice_input
 from streamlit_pages.voice_chat import voice_recorder_component, init_voice_chat
@@ -19,6 +22,104 @@ from streamlit_pages.enhanced_voice_input import enhanced_voice_input
 from streamlit_pages.enhanced_voice_input_simple import simplified_voice_input
 from streamlit_pages.cloud_safe_voice import cloud_safe_voice_input
 
+# Install locations, resolved once at import time
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_OPENMANUS_PATH = str(_REPO_ROOT / "openmanus")
+_OPENMANUS_WEB_PATH = str(_REPO_ROOT / "openmanus_web")
+
+_COMPUTER_IMG_URL = "https://raw.githubusercontent.com/YunQiAI/OpenManusWeb/main/public/computer.png"
+
+# Static markup, each emitted as a single markdown delta per rerun
+_BETA_BADGE_HTML = "<span style='background-color: #3a86ff; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px; font-weight: bold;'>BETA</span>"
+
+_WELCOME_HEADER_HTML = f"""
+<h3>OpenManus {_BETA_BADGE_HTML}</h3>
+<p>👋 Welcome to GlobalGPT OpenManus!</p>
+"""
+
+_COMPUTER_STATUS_HTML = f"""
+<h3>OpenManus {_BETA_BADGE_HTML}</h3>
+<p>Virtual Computer Environment Ready</p>
+<p style='display: flex; align-items: center; gap: 10px;'>
+    <span style='display: inline-block; width: 10px; height: 10px; background-color: #3a86ff; border-radius: 50%;'></span>
+    Standby mode - Waiting for task creation
+</p>
+"""
+
+_INSTRUCTIONS_HTML = """
+<h3>How to Start</h3>
+<ol>
+    <li>This model handles complex tasks and may use many tokens. Use wisely.</li>
+    <li>Enter your task description in the input field on the left</li>
+    <li>Click "Create Task" to start the virtual computer</li>
+    <li>The computer will automatically perform the task</li>
+    <li>You can observe and interact with the computer in this window</li>
+</ol>
+"""
+
+def _basic_voice_input():
+    """
+    Initialize voice chat and use the original voice recorder component
+    """
+    init_voice_chat()
+    return voice_recorder_component()
+
+# Voice input method -> component returning a transcription (or None)
+_VOICE_HANDLERS = {
+    "Basic Voice": _basic_voice_input,
+    "Magic UI Voice": lambda: enhanced_voice_input(key_prefix="openmanus", demo_mode=True),
+    "Simple Voice": lambda: simplified_voice_input(key_prefix="openmanus_simple", demo_mode=True),
+    "Cloud-Safe Voice": lambda: cloud_safe_voice_input(key_prefix="openmanus_cloud", demo_mode=True),
+}
+
+def _apply_transcription(transcription):
+    """
+    Update the task input with a voice transcription and rerun
+    """
+    st.session_state.task_input = transcription
+    st.success(f"Voice input captured: {transcription}")
+    # Wait a moment to show the success message before rerunning
+    time.sleep(1)
+    st.experimental_rerun()
+
+@st.cache_resource
+def _computer_image():
+    """
+    Fetch the computer illustration once per server, falling back to the URL
+    if the fetch fails; the fallback is cached too, so an offline host does
+    not wait on the timeout every rerun
+    """
+    try:
+        response = _n8n_session().get(_COMPUTER_IMG_URL, timeout=5)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        return _COMPUTER_IMG_URL
+    return response.content
+
+@st.fragment
+def _static_right_panel():
+    """
+    Static "OpenManus's Computer" panel, scoped as a fragment so its own
+    widgets rerun only this panel
+    """
+    st.markdown("### OpenManus's Computer")
+    
+    # Computer display
+    with st.container():
+        st.image(_computer_image(), width=100)
+        
+        st.markdown(_COMPUTER_STATUS_HTML, unsafe_allow_html=True)
+    
+    # Instructions
+    st.markdown(_INSTRUCTIONS_HTML, unsafe_allow_html=True)
+    
+    # Footer buttons
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("Reconnect", key="reconnect_button")
+    with col2:
+        st.button("Fullscreen", key="fullscreen_button")
+
 def openmanus_tab():
     """
     Tab for OpenManus integration with Owaiken
@@ -33,7 +134,7 @@ def openmanus_tab():
     left_col, right_col = st.columns([1, 1])
     
     # Check if OpenManus is installed
-    openmanus_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "openmanus")
+    openmanus_path = _OPENMANUS_PATH
     is_installed = os.path.exists(openmanus_path)
     
     with left_col:
@@ -42,13 +143,7 @@ def openmanus_tab():
         st.info("Beta version task data on OpenManus' computer will be automatically deleted after one hour of inactivity.")
         
         # OpenManus section
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.markdown("### OpenManus")
-        with col2:
-            st.markdown("<span style='background-color: #3a86ff; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px; font-weight: bold;'>BETA</span>", unsafe_allow_html=True)
-        
-        st.markdown("👋 Welcome to GlobalGPT OpenManus!")
+        st.markdown(_WELCOME_HEADER_HTML, unsafe_allow_html=True)
         
         # Task input area
         task_input = st.text_area("Type your task here...", height=150, key="task_input", label_visibility="collapsed")
@@ -59,7 +154,7 @@ def openmanus_tab():
         # Voice input options
         voice_option = st.radio(
             "Voice Input Method",
-            ["Basic Voice", "Magic UI Voice", "Simple Voice", "Cloud-Safe Voice"],
+            list(_VOICE_HANDLERS),
             horizontal=True,
             key="voice_option",
             label_visibility="collapsed"
@@ -67,48 +162,9 @@ def openmanus_tab():
         
         voice_container = st.container()
         with voice_container:
-            if voice_option == "Basic Voice":
-                # Initialize voice chat
-                init_voice_chat()
-                # Use the original voice recorder component
-                transcription = voice_recorder_component()
-                if transcription:
-                    # If we got a transcription, update the task input
-                    st.session_state.task_input = transcription
-                    st.success(f"Voice input captured: {transcription}")
-                    # Wait a moment to show the success message before rerunning
-                    time.sleep(1)
-                    st.experimental_rerun()
-            elif voice_option == "Magic UI Voice":
-                # Use the enhanced Magic UI voice component with demo mode enabled
-                transcription = enhanced_voice_input(key_prefix="openmanus", demo_mode=True)
-                if transcription:
-                    # If we got a transcription, update the task input
-                    st.session_state.task_input = transcription
-                    st.success(f"Voice input captured: {transcription}")
-                    # Wait a moment to show the success message before rerunning
-                    time.sleep(1)
-                    st.experimental_rerun()
-            elif voice_option == "Simple Voice":
-                # Use the simplified voice component with demo mode enabled
-                transcription = simplified_voice_input(key_prefix="openmanus_simple", demo_mode=True)
-                if transcription:
-                    # If we got a transcription, update the task input
-                    st.session_state.task_input = transcription
-                    st.success(f"Voice input captured: {transcription}")
-                    # Wait a moment to show the success message before rerunning
-                    time.sleep(1)
-                    st.experimental_rerun()
-            else:  # Cloud-Safe Voice option
-                # Use the cloud-safe voice component with demo mode enabled
-                transcription = cloud_safe_voice_input(key_prefix="openmanus_cloud", demo_mode=True)
-                if transcription:
-                    # If we got a transcription, update the task input
-                    st.session_state.task_input = transcription
-                    st.success(f"Voice input captured: {transcription}")
-                    # Wait a moment to show the success message before rerunning
-                    time.sleep(1)
-                    st.experimental_rerun()
+            transcription = _VOICE_HANDLERS[voice_option]()
+            if transcription:
+                _apply_transcription(transcription)
         
         # Create task button
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -123,38 +179,7 @@ def openmanus_tab():
     
     with right_col:
         # OpenManus Computer section
-        st.markdown("### OpenManus's Computer")
-        
-        # Computer display
-        with st.container():
-            st.image("https://raw.githubusercontent.com/YunQiAI/OpenManusWeb/main/public/computer.png", width=100)
-            
-            st.markdown("### OpenManus")
-            st.markdown("<span style='background-color: #3a86ff; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px; font-weight: bold;'>BETA</span>", unsafe_allow_html=True)
-            
-            st.markdown("Virtual Computer Environment Ready")
-            
-            status_col1, status_col2 = st.columns([1, 10])
-            with status_col1:
-                st.markdown("<div style='width: 10px; height: 10px; background-color: #3a86ff; border-radius: 50%; margin-top: 5px;'></div>", unsafe_allow_html=True)
-            with status_col2:
-                st.markdown("Standby mode - Waiting for task creation")
-        
-        # Instructions
-        with st.container():
-            st.markdown("### How to Start")
-            st.markdown("1. This model handles complex tasks and may use many tokens. Use wisely.")
-            st.markdown("2. Enter your task description in the input field on the left")
-            st.markdown("3. Click \"Create Task\" to start the virtual computer")
-            st.markdown("4. The computer will automatically perform the task")
-            st.markdown("5. You can observe and interact with the computer in this window")
-        
-        # Footer buttons
-        col1, col2 = st.columns(2)
-        with col1:
-            st.button("Reconnect", key="reconnect_button")
-        with col2:
-            st.button("Fullscreen", key="fullscreen_button")
+        _static_right_panel()
         
         # Display computer output if task is running
         if hasattr(st.session_state, 'task_running') and st.session_state.task_running:
@@ -193,13 +218,21 @@ def openmanus_tab():
             with tabs[2]:
                 display_workspace_tab(openmanus_path)
 
+@st.cache_data(ttl=None)
+def _load_config(config_path, mtime):
+    """
+    Parse config.toml, cached per (path, mtime) so reruns skip the disk read
+    """
+    with open(config_path, "rb") as f:
+        return tomllib.load(f)
+
 def install_openmanus():
     """
     Install OpenManus from GitHub
     """
     try:
         # Create openmanus directory
-        openmanus_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "openmanus")
+        openmanus_path = _OPENMANUS_PATH
         os.makedirs(openmanus_path, exist_ok=True)
         
         # Clone the repository
@@ -210,7 +243,7 @@ def install_openmanus():
         subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_path], check=True)
         
         # Clone the web repository
-        openmanus_web_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "openmanus_web")
+        openmanus_web_path = _OPENMANUS_WEB_PATH
         os.makedirs(openmanus_web_path, exist_ok=True)
         subprocess.run(["git", "clone", "https://github.com/YunQiAI/OpenManusWeb.git", openmanus_web_path], check=True)
         
@@ -239,15 +272,12 @@ def display_configuration_tab(openmanus_path):
     
     if not os.path.exists(config_path) and os.path.exists(config_example_path):
         # Copy example config
-        with open(config_example_path, 'r') as f:
-            example_config = f.read()
-        with open(config_path, 'w') as f:
-            f.write(example_config)
+        shutil.copyfile(config_example_path, config_path)
     
     if os.path.exists(config_path):
         try:
             # Load config
-            config = toml.load(config_path)
+            config = _load_config(config_path, os.path.getmtime(config_path))
             
             # Display and edit config
             st.markdown("#### LLM Configuration")
@@ -273,8 +303,9 @@ def display_configuration_tab(openmanus_path):
                 config['llm']['temperature'] = temperature
                 
                 # Save config
-                with open(config_path, 'w') as f:
-                    toml.dump(config, f)
+                with open(config_path, 'wb') as f:
+                    tomli_w.dump(config, f)
+                _load_config.clear()
                 
                 st.success("✅ Configuration saved successfully!")
         
@@ -335,6 +366,13 @@ def generate_simulated_output():
     
     return random.choice(outputs)
 
+@st.cache_resource
+def _n8n_session():
+    """
+    Shared HTTP session so N8N requests reuse pooled connections
+    """
+    return requests.Session()
+
 def display_n8n_integration_tab(openmanus_path):
     """
     Display N8N integration options for OpenManus
@@ -353,13 +391,17 @@ def display_n8n_integration_tab(openmanus_path):
             if n8n_api_key:
                 headers["X-N8N-API-KEY"] = n8n_api_key
             
-            response = requests.get(f"{n8n_url}/healthz", headers=headers)
+            # Cheap reachability probe before the full health check
+            _n8n_session().head(n8n_url, timeout=(2, 3))
+            response = _n8n_session().get(f"{n8n_url}/healthz", headers=headers, timeout=(2, 5))
             
             if response.status_code == 200:
                 st.success("✅ Successfully connected to N8N!")
             else:
                 st.error(f"❌ Failed to connect to N8N. Status code: {response.status_code}")
         
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            st.error(f"❌ Could not reach N8N at {n8n_url}. Check the URL and that N8N is running.")
         except Exception as e:
             st.error(f"❌ Error connecting to N8N: {str(e)}")
     
@@ -644,6 +686,15 @@ def generate_n8n_workflow(name, description, workflow_type, n8n_url):
     
     return workflow
 
+@st.cache_data(max_entries=16)
+def _read_text(path, mtime, size):
+    """
+    Read a workspace text file for preview, cached per (path, mtime, size)
+    """
+    if size > 1_000_000:
+        return None
+    return Path(path).read_bytes().decode("utf-8", "replace")
+
 def display_workspace_tab(openmanus_path):
     """
     Display workspace files from OpenManus
@@ -690,10 +741,11 @@ def display_workspace_tab(openmanus_path):
             
             if ext in ['.txt', '.md', '.py', '.js', '.html', '.css', '.json', '.xml', '.csv']:
                 try:
-                    with open(file['full_path'], 'r') as f:
-                        content = f.read()
+                    content = _read_text(file['full_path'], file['modified'], file['size'])
                     
-                    if ext == '.py':
+                    if content is None:
+                        st.info("File is too large to preview.")
+                    elif ext == '.py':
                         st.code(content, language='python')
                     elif ext == '.js':
                         st.code(content, language='javascript')
@@ -726,6 +778,7 @@ def display_workspace_tab(openmanus_path):
                     mime="application/octet-stream"
                 )
 
+@lru_cache(maxsize=512)
 def format_size(size_bytes):
     """
     Format file size in a human-readable format
@@ -4,12 +4,64 @@ Implements secure database operations using prepared statements
 """
 import os
 import uuid
-import json
 import time
 import streamlit as st
 from typing import Dict, Any, List, Optional, Union, Tuple
 from datetime import datetime
+from functools import lru_cache
 from supabase import create_client, Client
+from streamlit_pages.security_config import get_security_config
+
+# Set once the stored procedures have been created in this process
+_PROCS_INITIALIZED = False
+
+def _supabase_credentials() -> Tuple[str, str]:
+    """Supabase URL and key from Streamlit secrets or the environment"""
+    config = get_security_config()
+    return config.supabase_url, config.supabase_key
+
+@lru_cache(maxsize=1)
+def _get_client() -> Optional[Client]:
+    """
+    Shared Supabase client for the process
+    
+    One client means one underlying HTTP connection pool, so keep-alive
+    connections are reused across managers and sessions instead of being
+    re-established per instance.
+    """
+    supabase_url, supabase_key = _supabase_credentials()
+    
+    if not supabase_url or not supabase_key:
+        return None
+    
+    return create_client(supabase_url, supabase_key)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_user_subscription(_client: Client, user_id: str) -> Optional[Dict[str, Any]]:
+    """Latest subscription for a user, cached for 60 seconds"""
+    response = _client.rpc(
+        "get_user_subscription", 
+        {"p_user_id": user_id}
+    ).execute()
+    
+    if response.data and len(response.data) > 0:
+        return response.data[0]
+    return None
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_active_subscriptions(_client: Client, user_id: str) -> List[Dict[str, Any]]:
+    """Active subscriptions for a user, cached for 60 seconds"""
+    response = _client.rpc(
+        "get_active_subscriptions", 
+        {"p_user_id": user_id}
+    ).execute()
+    
+    return response.data or []
+
+def _clear_subscription_cache():
+    """Drop cached subscription reads after a write"""
+    _fetch_user_subscription.clear()
+    _fetch_active_subscriptions.clear()
 
 class PreparedStatementManager:
     """
@@ -29,16 +81,12 @@ class PreparedStatementManager:
         self.supabase = supabase_client
         
         if not self.supabase:
-            # Try to get client from environment
-            supabase_url = st.secrets.get("SUPABASE_URL", os.environ.get("SUPABASE_URL", ""))
-            supabase_key = st.secrets.get("SUPABASE_KEY", os.environ.get("SUPABASE_KEY", ""))
-            
-            if supabase_url and supabase_key:
-                try:
-                    self.supabase = create_client(supabase_url, supabase_key)
-                except Exception as e:
-                    st.error(f"Error connecting to Supabase: {str(e)}")
-                    self.supabase = None
+            # Fall back to the shared process-wide client
+            try:
+                self.supabase = _get_client()
+            except Exception as e:
+                st.error(f"Error connecting to Supabase: {str(e)}")
+                self.supabase = None
     
     def _create_stored_procedures(self):
         """Create stored procedures in Supabase for prepared statements"""
@@ -86,7 +134,8 @@ class PreparedStatementManager:
                     user_id, plan, status, payment_id, amount, created_at, expires_at
                 )
                 VALUES (
-                    p_user_id, p_plan, p_status, p_payment_id, p_amount, NOW(), p_expires_at
+                    p_user_id, p_plan, p_status, p_payment_id, p_amount, NOW(),
+                    COALESCE(p_expires_at, NOW() + INTERVAL '30 days')
                 )
                 RETURNING * INTO v_subscription;
                 
@@ -95,6 +144,34 @@ class PreparedStatementManager:
             $$;
             """,
             
+            # Create user subscriptions in bulk
+            """
+            CREATE OR REPLACE FUNCTION create_user_subscriptions_bulk(p_rows JSONB)
+            RETURNS SETOF subscriptions
+            LANGUAGE plpgsql
+            SECURITY DEFINER
+            AS $$
+            BEGIN
+                RETURN QUERY
+                INSERT INTO subscriptions (
+                    user_id, plan, status, payment_id, amount, created_at, expires_at
+                )
+                SELECT
+                    x.user_id, x.plan, COALESCE(x.status, 'active'), x.payment_id, x.amount, NOW(),
+                    COALESCE(x.expires_at, NOW() + INTERVAL '30 days')
+                FROM jsonb_to_recordset(p_rows) AS x(
+                    user_id TEXT,
+                    plan TEXT,
+                    status TEXT,
+                    payment_id TEXT,
+                    amount INTEGER,
+                    expires_at TIMESTAMP
+                )
+                RETURNING *;
+            END;
+            $$;
+            """,
+            
             # Update user subscription
             """
             CREATE OR REPLACE FUNCTION update_user_subscription(
@@ -153,10 +230,9 @@ class PreparedStatementManager:
             """
         ]
         
-        # Execute each procedure creation
+        # Create all procedures in a single round trip
         try:
-            for procedure in procedures:
-                self.supabase.rpc("exec_sql", {"sql": procedure}).execute()
+            self.supabase.rpc("exec_sql", {"sql": "\n".join(procedures)}).execute()
             return True
         except Exception as e:
             st.error(f"Error creating stored procedures: {str(e)}")
@@ -164,10 +240,17 @@ class PreparedStatementManager:
     
     def initialize(self) -> bool:
         """Initialize the prepared statement manager"""
+        global _PROCS_INITIALIZED
+        
         if not self.supabase:
             return False
         
-        return self._create_stored_procedures()
+        # The DDL is idempotent, so only run it once per process
+        if _PROCS_INITIALIZED:
+            return True
+        
+        _PROCS_INITIALIZED = self._create_stored_procedures()
+        return _PROCS_INITIALIZED
     
     def get_user_subscription(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -183,14 +266,7 @@ class PreparedStatementManager:
             return None
         
         try:
-            response = self.supabase.rpc(
-                "get_user_subscription", 
-                {"p_user_id": user_id}
-            ).execute()
-            
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            return None
+            return _fetch_user_subscription(self.supabase, user_id)
         except Exception as e:
             st.error(f"Error getting user subscription: {str(e)}")
             return None
@@ -209,12 +285,7 @@ class PreparedStatementManager:
             return []
         
         try:
-            response = self.supabase.rpc(
-                "get_active_subscriptions", 
-                {"p_user_id": user_id}
-            ).execute()
-            
-            return response.data or []
+            return _fetch_active_subscriptions(self.supabase, user_id)
         except Exception as e:
             st.error(f"Error getting active subscriptions: {str(e)}")
             return []
@@ -245,11 +316,6 @@ class PreparedStatementManager:
         if not self.supabase:
             return None
         
-        # Set default expiration if not provided
-        if not expires_at:
-            from datetime import datetime, timedelta
-            expires_at = datetime.now() + timedelta(days=30)
-        
         try:
             response = self.supabase.rpc(
                 "create_user_subscription", 
@@ -259,9 +325,11 @@ class PreparedStatementManager:
                     "p_status": status,
                     "p_payment_id": payment_id,
                     "p_amount": amount,
-                    "p_expires_at": expires_at.isoformat()
+                    # NULL lets the procedure default to 30 days from now
+                    "p_expires_at": expires_at.isoformat() if expires_at else None
                 }
             ).execute()
+            _clear_subscription_cache()
             
             if response.data:
                 return response.data
@@ -270,6 +338,40 @@ class PreparedStatementManager:
             st.error(f"Error creating user subscription: {str(e)}")
             return None
     
+    def create_user_subscriptions_bulk(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several subscriptions in a single RPC
+        
+        Args:
+            rows: Dicts with user_id, plan, payment_id, amount and optional
+                status (default "active") and expires_at (default 30 days)
+            
+        Returns:
+            Created subscriptions
+        """
+        if not self.supabase or not rows:
+            return []
+        
+        payload = [
+            {
+                **row,
+                "expires_at": row["expires_at"].isoformat() if row.get("expires_at") else None
+            }
+            for row in rows
+        ]
+        
+        try:
+            response = self.supabase.rpc(
+                "create_user_subscriptions_bulk",
+                {"p_rows": payload}
+            ).execute()
+            _clear_subscription_cache()
+            
+            return response.data or []
+        except Exception as e:
+            st.error(f"Error creating user subscriptions: {str(e)}")
+            return []
+    
     def update_user_subscription(
         self,
         subscription_id: str,
@@ -305,6 +407,7 @@ class PreparedStatementManager:
                     "p_expires_at": expires_at.isoformat()
                 }
             ).execute()
+            _clear_subscription_cache()
             
             if response.data:
                 return response.data
@@ -313,11 +416,18 @@ class PreparedStatementManager:
             st.error(f"Error updating user subscription: {str(e)}")
             return None
 
+@lru_cache(maxsize=1)
+def _prepared_statement_manager() -> PreparedStatementManager:
+    """Create the process-wide manager"""
+    return PreparedStatementManager()
+
 # Get prepared statement manager instance
 def get_prepared_statement_manager():
-    """Get or create the prepared statement manager instance"""
-    if "prepared_statement_manager" not in st.session_state:
-        st.session_state.prepared_statement_manager = PreparedStatementManager()
-        st.session_state.prepared_statement_manager.initialize()
+    """Get or create the prepared statement manager instance (shared per process)"""
+    manager = _prepared_statement_manager()
     
-    return st.session_state.prepared_statement_manager
+    # Retry creating the stored procedures until it succeeds; the manager is
+    # cached either way, so a failed first attempt must not be final
+    if not _PROCS_INITIALIZED:
+        manager.initialize()
+    return manager
@@ -4,13 +4,16 @@ Implements advanced rate limiting to prevent abuse and ensure fair usage
 """
 import time
 import threading
-import hashlib
+from collections import deque
 import redis
+import xxhash
+from cachetools import TTLCache
 import os
 import streamlit as st
 from datetime import datetime, timedelta
-from functools import wraps
-from typing import Dict, Any, List, Optional, Union, Callable
+from functools import wraps, lru_cache
+from typing import Dict, Any, List, Optional, Union, Callable, Tuple
+from streamlit_pages.security_config import get_security_config
 
 # Rate limiting algorithms
 class TokenBucket:
@@ -20,6 +23,8 @@ class TokenBucket:
     - Allows for bursts within limits
     - Industry standard for API rate limiting
     """
+    __slots__ = ("rate", "capacity", "tokens", "last_refill", "lock")
+
     def __init__(self, rate: float, capacity: float):
         """
         Initialize a token bucket
@@ -31,8 +36,8 @@ class TokenBucket:
         self.rate = rate
         self.capacity = capacity
         self.tokens = capacity
-        self.last_refill = time.time()
-        self.lock = threading.RLock()
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
     
     def consume(self, tokens: float = 1.0) -> bool:
         """
@@ -44,12 +49,16 @@ class TokenBucket:
         Returns:
             bool: True if tokens were consumed, False if not enough tokens
         """
+        # Read the clock outside the lock to keep the critical section short
+        now = time.monotonic()
+        
         with self.lock:
-            # Refill tokens based on time elapsed
-            now = time.time()
+            # Refill tokens based on time elapsed (another thread may have
+            # refilled with a later timestamp in the meantime)
             elapsed = now - self.last_refill
-            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
-            self.last_refill = now
+            if elapsed > 0:
+                self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+                self.last_refill = now
             
             # Check if enough tokens and consume
             if tokens <= self.tokens:
@@ -64,6 +73,8 @@ class SlidingWindowCounter:
     - Prevents edge-case bursts
     - Used by major API providers like GitHub
     """
+    __slots__ = ("window_size", "max_requests", "requests", "lock")
+
     def __init__(self, window_size: int, max_requests: int):
         """
         Initialize a sliding window counter
@@ -74,7 +85,7 @@ class SlidingWindowCounter:
         """
         self.window_size = window_size
         self.max_requests = max_requests
-        self.requests = []
+        self.requests = deque()
         self.lock = threading.RLock()
     
     def check_and_record(self) -> bool:
@@ -87,8 +98,10 @@ class SlidingWindowCounter:
         with self.lock:
             now = time.time()
             
-            # Remove expired timestamps
-            self.requests = [ts for ts in self.requests if now - ts < self.window_size]
+            # Remove expired timestamps. They are appended in order, so expired
+            # ones are always at the left and each is popped exactly once
+            while self.requests and now - self.requests[0] >= self.window_size:
+                self.requests.popleft()
             
             # Check if under limit
             if len(self.requests) < self.max_requests:
@@ -96,6 +109,23 @@ class SlidingWindowCounter:
                 return True
             return False
 
+# In-memory fallback counters shared by all limiters in the process,
+# keyed by (identifier, window_seconds, max_requests)
+_IN_MEMORY_LIMITERS: Dict[Tuple[str, int, int], SlidingWindowCounter] = {}
+
+# Increments every key and sets its expiry on first hit, in one round trip
+_INCR_WINDOWS_LUA = """
+local counts = {}
+for i, key in ipairs(KEYS) do
+    local current = redis.call('INCR', key)
+    if current == 1 then
+        redis.call('EXPIRE', key, ARGV[i])
+    end
+    counts[i] = current
+end
+return counts
+"""
+
 # Redis-backed rate limiters for distributed environments
 class RedisRateLimiter:
     """
@@ -104,6 +134,8 @@ class RedisRateLimiter:
     - Persistent across application restarts
     - Used by enterprise applications
     """
+    __slots__ = ("prefix", "redis_url", "redis", "enabled", "_incr_windows")
+
     def __init__(self, redis_url: Optional[str] = None, prefix: str = "rate_limit"):
         """
         Initialize Redis rate limiter
@@ -113,11 +145,12 @@ class RedisRateLimiter:
             prefix: Key prefix for Redis
         """
         self.prefix = prefix
-        self.redis_url = redis_url or os.environ.get("REDIS_URL") or st.secrets.get("REDIS_URL")
+        self.redis_url = redis_url or get_security_config().redis_url
         
         if self.redis_url:
             try:
                 self.redis = redis.from_url(self.redis_url)
+                self._incr_windows = self.redis.register_script(_INCR_WINDOWS_LUA)
                 self.enabled = True
             except Exception as e:
                 print(f"Redis connection error: {str(e)}")
@@ -144,24 +177,48 @@ class RedisRateLimiter:
         """
         if not self.enabled:
             # Fall back to in-memory rate limiting
-            if not hasattr(self, '_in_memory_limiters'):
-                self._in_memory_limiters = {}
+            key = (identifier, window_seconds, max_requests)
+            counter = _IN_MEMORY_LIMITERS.get(key)
+            if counter is None:
+                # setdefault is atomic under the GIL, so racing threads share one counter
+                counter = _IN_MEMORY_LIMITERS.setdefault(key, SlidingWindowCounter(window_seconds, max_requests))
             
-            key = f"{identifier}:{window_seconds}"
-            if key not in self._in_memory_limiters:
-                self._in_memory_limiters[key] = SlidingWindowCounter(window_seconds, max_requests)
-            
-            return not self._in_memory_limiters[key].check_and_record()
+            return not counter.check_and_record()
+        
+        # Use Redis for distributed rate limiting (same counters as check_windows)
+        return self.check_windows([(identifier, max_requests, window_seconds)])[0]
+    
+    def check_windows(self, windows: List[Tuple[str, int, int]]) -> List[bool]:
+        """
+        Check several rate limits at once
         
-        # Use Redis for distributed rate limiting
-        key = self._get_key(identifier, f"{window_seconds}s")
-        current = self.redis.incr(key)
+        Args:
+            windows: (identifier, max_requests, window_seconds) tuples
+            
+        Returns:
+            List[bool]: True for each window that is rate limited
+        """
+        if not self.enabled:
+            return [
+                self.is_rate_limited(identifier, max_requests, window_seconds)
+                for identifier, max_requests, window_seconds in windows
+            ]
         
-        # Set expiration if this is the first request in window
-        if current == 1:
-            self.redis.expire(key, window_seconds)
+        # Use a single Lua script call for all windows
+        keys = [self._get_key(identifier, f"{window_seconds}s") for identifier, _, window_seconds in windows]
+        counts = self._incr_windows(keys=keys, args=[window_seconds for _, _, window_seconds in windows])
         
-        return current > max_requests
+        return [count > max_requests for count, (_, max_requests, _) in zip(counts, windows)]
+
+@lru_cache(maxsize=100_000)
+def _window_ids(identifier: str) -> Tuple[str, str, str]:
+    """
+    Hashed (minute, hour, day) rate-limit identifiers, computed once per user
+    
+    xxh3 is non-cryptographic; the hash only makes an opaque bucket key.
+    """
+    hashed_id = xxhash.xxh3_64_hexdigest(identifier)
+    return (f"{hashed_id}:minute", f"{hashed_id}:hour", f"{hashed_id}:day")
 
 # Rate limiting decorators
 def rate_limit(
@@ -201,12 +258,14 @@ def rate_limit(
                         identifier = st.request.headers.get("X-Forwarded-For", "unknown")
             
             # Hash the identifier for privacy
-            hashed_id = hashlib.md5(identifier.encode()).hexdigest()
+            minute_id, hour_id, day_id = _window_ids(identifier)
             
             # Check rate limits at different time scales
-            minute_limited = limiter.is_rate_limited(f"{hashed_id}:minute", requests_per_minute, 60)
-            hour_limited = limiter.is_rate_limited(f"{hashed_id}:hour", requests_per_hour, 3600)
-            day_limited = limiter.is_rate_limited(f"{hashed_id}:day", requests_per_day, 86400)
+            minute_limited, hour_limited, day_limited = limiter.check_windows([
+                (minute_id, requests_per_minute, 60),
+                (hour_id, requests_per_hour, 3600),
+                (day_id, requests_per_day, 86400),
+            ])
             
             if minute_limited:
                 st.error("Rate limit exceeded. Please try again in a minute.")
@@ -226,14 +285,25 @@ def rate_limit(
     return decorator
 
 # Application-specific rate limiters
+# Bits returned by OwaikanRateLimiter.check_rate_limit_fast for each exceeded window
+RATE_LIMIT_MINUTE = 1
+RATE_LIMIT_HOUR = 2
+RATE_LIMIT_DAY = 4
+
 class OwaikanRateLimiter:
     """
     Owaikan-specific rate limiter with tiered limits based on subscription
     """
+    __slots__ = ("limiter", "tier_limits", "_local", "_local_lock")
+
     def __init__(self, redis_url: Optional[str] = None):
         """Initialize with optional Redis URL"""
         self.limiter = RedisRateLimiter(redis_url)
         
+        # (user_id, tier) -> per-process token bucket at the tier's per-minute rate
+        self._local = TTLCache(maxsize=50_000, ttl=120)
+        self._local_lock = threading.Lock()
+        
         # Define tier limits
         self.tier_limits = {
             "free": {
@@ -258,46 +328,75 @@ class OwaikanRateLimiter:
             }
         }
     
-    def check_rate_limit(self, user_id: str, tier: str = "free") -> Dict[str, bool]:
+    def _local_bucket(self, user_id: str, tier: str, limits: Dict[str, int]) -> TokenBucket:
+        """Get or create the per-process token bucket for a user and tier"""
+        key = (user_id, tier)
+        with self._local_lock:
+            bucket = self._local.get(key)
+            if bucket is None:
+                bucket = self._local[key] = TokenBucket(limits["minute"] / 60, limits["minute"])
+        return bucket
+    
+    def check_rate_limit_fast(self, user_id: str, tier: str = "free") -> int:
         """
-        Check rate limits for a user based on their subscription tier
+        Check rate limits for a user without building a result dict
         
         Args:
             user_id: User ID
             tier: Subscription tier (free, basic, premium, enterprise)
             
         Returns:
-            Dict with rate limit status for different time windows
+            0 if allowed, otherwise RATE_LIMIT_MINUTE/HOUR/DAY bits for exceeded windows
         """
         # Get limits for tier (default to free)
         limits = self.tier_limits.get(tier, self.tier_limits["free"])
         
+        # Skip the Redis round trip when this process already denies the request
+        if not self._local_bucket(user_id, tier, limits).consume():
+            return RATE_LIMIT_MINUTE
+        
         # Hash the user ID
-        hashed_id = hashlib.md5(user_id.encode()).hexdigest()
+        minute_id, hour_id, day_id = _window_ids(user_id)
         
         # Check rate limits
-        minute_limited = self.limiter.is_rate_limited(
-            f"{hashed_id}:minute", limits["minute"], 60
-        )
-        hour_limited = self.limiter.is_rate_limited(
-            f"{hashed_id}:hour", limits["hour"], 3600
-        )
-        day_limited = self.limiter.is_rate_limited(
-            f"{hashed_id}:day", limits["day"], 86400
+        minute_limited, hour_limited, day_limited = self.limiter.check_windows([
+            (minute_id, limits["minute"], 60),
+            (hour_id, limits["hour"], 3600),
+            (day_id, limits["day"], 86400),
+        ])
+        
+        return (
+            (RATE_LIMIT_MINUTE if minute_limited else 0)
+            | (RATE_LIMIT_HOUR if hour_limited else 0)
+            | (RATE_LIMIT_DAY if day_limited else 0)
         )
+    
+    def check_rate_limit(self, user_id: str, tier: str = "free") -> Dict[str, bool]:
+        """
+        Check rate limits for a user based on their subscription tier
+        
+        Args:
+            user_id: User ID
+            tier: Subscription tier (free, basic, premium, enterprise)
+            
+        Returns:
+            Dict with rate limit status for different time windows
+        """
+        flags = self.check_rate_limit_fast(user_id, tier)
         
         return {
-            "minute_limited": minute_limited,
-            "hour_limited": hour_limited,
-            "day_limited": day_limited,
-            "is_limited": minute_limited or hour_limited or day_limited
+            "minute_limited": bool(flags & RATE_LIMIT_MINUTE),
+            "hour_limited": bool(flags & RATE_LIMIT_HOUR),
+            "day_limited": bool(flags & RATE_LIMIT_DAY),
+            "is_limited": flags != 0
         }
 
+@lru_cache(maxsize=1)
+def _rate_limiter() -> OwaikanRateLimiter:
+    """Create the process-wide rate limiter"""
+    return OwaikanRateLimiter(get_security_config().redis_url)
+
 # Get the rate limiter instance
 def get_rate_limiter():
-    """Get or create the rate limiter instance"""
-    if "rate_limiter" not in st.session_state:
-        redis_url = st.secrets.get("REDIS_URL", os.environ.get("REDIS_URL"))
-        st.session_state.rate_limiter = OwaikanRateLimiter(redis_url)
-    
-    return st.session_state.rate_limiter
+    """Get or create the rate limiter instance (shared per process)"""
+    return _rate_limiter()
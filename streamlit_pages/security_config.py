@@ -5,14 +5,33 @@ Implements row-level security policies and SQL injection prevention
 import streamlit as st
 import os
 import re
+from dataclasses import dataclass
+from functools import lru_cache
 from supabase import create_client, Client
 from typing import Dict, Any, List, Optional, Union
 
+@dataclass(frozen=True)
+class SecurityConfig:
+    """Connection settings shared by the security modules"""
+    supabase_url: str
+    supabase_key: str
+    redis_url: Optional[str]
+
+@lru_cache(maxsize=1)
+def get_security_config() -> SecurityConfig:
+    """Read secrets once per process (Streamlit secrets first, then environment)"""
+    return SecurityConfig(
+        supabase_url=st.secrets.get("SUPABASE_URL", os.environ.get("SUPABASE_URL", "")),
+        supabase_key=st.secrets.get("SUPABASE_KEY", os.environ.get("SUPABASE_KEY", "")),
+        redis_url=st.secrets.get("REDIS_URL", os.environ.get("REDIS_URL"))
+    )
+
 # Initialize Supabase client with security focus
 def get_secure_supabase_client():
     """Get Supabase client with security configurations"""
-    supabase_url = st.secrets.get("SUPABASE_URL", os.environ.get("SUPABASE_URL", ""))
-    supabase_key = st.secrets.get("SUPABASE_KEY", os.environ.get("SUPABASE_KEY", ""))
+    config = get_security_config()
+    supabase_url = config.supabase_url
+    supabase_key = config.supabase_key
     
     if not supabase_url or not supabase_key:
         st.warning("Supabase credentials not found. Running in demo mode.")
@@ -36,105 +55,129 @@ def get_secure_supabase_client():
         return None
 
 # SQL Injection Prevention
+# Comment and terminator patterns, removed first: taking them out can join
+# the pieces of a keyword (e.g. "SEL;ECT ", "DR--OP TABLE")
+_SQL_PUNCTUATION_PATTERN = re.compile(
+    r"--"               # SQL comment
+    r"|;"               # Statement terminator
+    r"|/\*.*?\*/"       # Block comment
+)
+
+# Keyword patterns combined into one alternation so each pass is a single scan
+_SQL_KEYWORD_PATTERN = re.compile(
+    r"DROP\s+TABLE"     # Drop table
+    r"|DELETE\s+FROM"   # Delete from
+    r"|INSERT\s+INTO"   # Insert into
+    r"|UPDATE\s+"       # Update
+    r"|UNION\s+SELECT"  # Union select
+    r"|SELECT\s+"       # Select
+    r"|ALTER\s+TABLE"   # Alter table
+    r"|EXECUTE\s+"      # Execute
+    r"|EXEC\s+",        # Exec
+    re.IGNORECASE
+)
+
+def _remove_all(pattern: re.Pattern, value: str) -> str:
+    """Remove pattern matches until none are left (a removal can form a new match)"""
+    value, count = pattern.subn("", value)
+    while count:
+        value, count = pattern.subn("", value)
+    return value
+
+# Every punctuation pattern needs one of these characters to match
+_SQL_TRIGGER_CHARS = frozenset(";-/")
+
 def sanitize_input(input_string: str) -> str:
     """Sanitize input to prevent SQL injection"""
     if not isinstance(input_string, str):
         return str(input_string)
     
-    # Remove any SQL injection patterns
-    patterns = [
-        r"--",              # SQL comment
-        r";",               # Statement terminator
-        r"\/\*.*?\*\/",     # Block comment
-        r"DROP\s+TABLE",    # Drop table
-        r"DELETE\s+FROM",   # Delete from
-        r"INSERT\s+INTO",   # Insert into
-        r"UPDATE\s+",       # Update
-        r"UNION\s+SELECT",  # Union select
-        r"SELECT\s+",       # Select
-        r"ALTER\s+TABLE",   # Alter table
-        r"EXEC\s+",         # Exec
-        r"EXECUTE\s+",      # Execute
-    ]
-    
-    sanitized = input_string
-    for pattern in patterns:
-        sanitized = re.sub(pattern, "", sanitized, flags=re.IGNORECASE)
-    
-    return sanitized
+    # Fast path: nothing either pattern could match. Keywords are screened with
+    # the pattern itself, since IGNORECASE also matches Unicode case variants ("ſelect")
+    if _SQL_TRIGGER_CHARS.isdisjoint(input_string) and not _SQL_KEYWORD_PATTERN.search(input_string):
+        return input_string
+    
+    # Remove any SQL injection patterns, punctuation before keywords
+    return _remove_all(_SQL_KEYWORD_PATTERN, _remove_all(_SQL_PUNCTUATION_PATTERN, input_string))
+
+# Known columns per table; identifiers are checked against these instead of sanitized
+_ALLOWED_COLUMNS: Dict[str, frozenset] = {
+    "subscriptions": frozenset({
+        "id", "user_id", "plan", "status", "payment_id", "amount", "created_at", "expires_at"
+    }),
+}
 
 # Secure query builder for Supabase
 class SecureQueryBuilder:
     """Secure query builder to prevent SQL injection"""
     
     def __init__(self, supabase: Client, table: str):
+        allowed_columns = _ALLOWED_COLUMNS.get(table)
+        if allowed_columns is None:
+            raise ValueError(f"Unknown table: {table} (add its columns to _ALLOWED_COLUMNS)")
+        
         self.supabase = supabase
         self.table = table
         self.query = supabase.table(table)
+        self._allowed_columns = allowed_columns
+    
+    def _check_column(self, column: str) -> str:
+        """Reject column names that are not known for this table"""
+        if column not in self._allowed_columns:
+            raise ValueError(f"Unknown column for {self.table}: {column}")
+        return column
+    
+    def _check_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Check all keys and sanitize string values"""
+        return {
+            self._check_column(key): sanitize_input(value) if isinstance(value, str) else value
+            for key, value in data.items()
+        }
     
     def select(self, columns: Union[str, List[str]] = "*") -> "SecureQueryBuilder":
         """Secure select operation"""
         if isinstance(columns, list):
-            # Sanitize each column name
-            columns = [sanitize_input(col) for col in columns]
+            # Check each column name
+            columns = [self._check_column(col) for col in columns]
         elif columns != "*":
-            columns = sanitize_input(columns)
+            # Check each name in a comma-separated list such as "id, plan"
+            columns = ",".join(self._check_column(col.strip()) for col in columns.split(","))
         
         self.query = self.query.select(columns)
         return self
     
     def insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Secure insert operation"""
-        # Sanitize all keys and string values
-        sanitized_data = {}
-        for key, value in data.items():
-            sanitized_key = sanitize_input(key)
-            sanitized_value = sanitize_input(value) if isinstance(value, str) else value
-            sanitized_data[sanitized_key] = sanitized_value
-        
-        response = self.query.insert(sanitized_data).execute()
+        response = self.query.insert(self._check_data(data)).execute()
         return response.data[0] if response.data else None
     
     def update(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Secure update operation"""
-        # Sanitize all keys and string values
-        sanitized_data = {}
-        for key, value in data.items():
-            sanitized_key = sanitize_input(key)
-            sanitized_value = sanitize_input(value) if isinstance(value, str) else value
-            sanitized_data[sanitized_key] = sanitized_value
-        
-        response = self.query.update(sanitized_data).execute()
+        response = self.query.update(self._check_data(data)).execute()
         return response.data[0] if response.data else None
     
     def eq(self, column: str, value: Any) -> "SecureQueryBuilder":
         """Secure equals filter"""
-        sanitized_column = sanitize_input(column)
         sanitized_value = sanitize_input(value) if isinstance(value, str) else value
         
-        self.query = self.query.eq(sanitized_column, sanitized_value)
+        self.query = self.query.eq(self._check_column(column), sanitized_value)
         return self
     
     def neq(self, column: str, value: Any) -> "SecureQueryBuilder":
         """Secure not equals filter"""
-        sanitized_column = sanitize_input(column)
         sanitized_value = sanitize_input(value) if isinstance(value, str) else value
         
-        self.query = self.query.neq(sanitized_column, sanitized_value)
+        self.query = self.query.neq(self._check_column(column), sanitized_value)
         return self
     
     def gt(self, column: str, value: Any) -> "SecureQueryBuilder":
         """Secure greater than filter"""
-        sanitized_column = sanitize_input(column)
-        
-        self.query = self.query.gt(sanitized_column, value)
+        self.query = self.query.gt(self._check_column(column), value)
         return self
     
     def lt(self, column: str, value: Any) -> "SecureQueryBuilder":
         """Secure less than filter"""
-        sanitized_column = sanitize_input(column)
-        
-        self.query = self.query.lt(sanitized_column, value)
+        self.query = self.query.lt(self._check_column(column), value)
         return self
     
     def limit(self, count: int) -> "SecureQueryBuilder":
@@ -144,15 +187,38 @@ class SecureQueryBuilder:
     
     def order(self, column: str, ascending: bool = True) -> "SecureQueryBuilder":
         """Secure order operation"""
-        sanitized_column = sanitize_input(column)
-        
-        self.query = self.query.order(sanitized_column, ascending=ascending)
+        self.query = self.query.order(self._check_column(column), ascending=ascending)
         return self
     
     def execute(self) -> Dict[str, Any]:
         """Execute the query"""
         return self.query.execute()
 
+# Row Level Security policies for the subscriptions table
+_RLS_POLICIES_SQL = """
+ALTER TABLE subscriptions ENABLE ROW LEVEL SECURITY;
+
+-- Allow users to only see their own subscriptions
+DROP POLICY IF EXISTS users_can_see_own_subscriptions ON subscriptions;
+CREATE POLICY users_can_see_own_subscriptions ON subscriptions
+    FOR SELECT USING (auth.uid()::text = user_id);
+
+-- Allow users to only update their own subscriptions
+DROP POLICY IF EXISTS users_can_update_own_subscriptions ON subscriptions;
+CREATE POLICY users_can_update_own_subscriptions ON subscriptions
+    FOR UPDATE USING (auth.uid()::text = user_id);
+
+-- Allow users to only insert their own subscriptions
+DROP POLICY IF EXISTS users_can_insert_own_subscriptions ON subscriptions;
+CREATE POLICY users_can_insert_own_subscriptions ON subscriptions
+    FOR INSERT WITH CHECK (auth.uid()::text = user_id);
+
+-- Prevent deletion of subscriptions (no one can delete)
+DROP POLICY IF EXISTS prevent_subscription_deletion ON subscriptions;
+CREATE POLICY prevent_subscription_deletion ON subscriptions
+    FOR DELETE USING (false);
+"""
+
 # Setup Row Level Security
 def setup_row_level_security(supabase: Client) -> bool:
     """Set up Row Level Security policies for all tables"""
@@ -160,58 +226,8 @@ def setup_row_level_security(supabase: Client) -> bool:
         return False
     
     try:
-        # Create RLS policies for subscriptions table
-        supabase.rpc(
-            "setup_rls_policies",
-            {
-                "table_name": "subscriptions",
-                "enable_rls": True
-            }
-        ).execute()
-        
-        # Create policy to allow users to only see their own subscriptions
-        supabase.rpc(
-            "create_policy",
-            {
-                "table_name": "subscriptions",
-                "policy_name": "users_can_see_own_subscriptions",
-                "policy_definition": "auth.uid()::text = user_id",
-                "policy_operation": "SELECT"
-            }
-        ).execute()
-        
-        # Create policy to allow users to only update their own subscriptions
-        supabase.rpc(
-            "create_policy",
-            {
-                "table_name": "subscriptions",
-                "policy_name": "users_can_update_own_subscriptions",
-                "policy_definition": "auth.uid()::text = user_id",
-                "policy_operation": "UPDATE"
-            }
-        ).execute()
-        
-        # Create policy to allow users to only insert their own subscriptions
-        supabase.rpc(
-            "create_policy",
-            {
-                "table_name": "subscriptions",
-                "policy_name": "users_can_insert_own_subscriptions",
-                "policy_definition": "auth.uid()::text = user_id",
-                "policy_operation": "INSERT"
-            }
-        ).execute()
-        
-        # Create policy to prevent deletion of subscriptions
-        supabase.rpc(
-            "create_policy",
-            {
-                "table_name": "subscriptions",
-                "policy_name": "prevent_subscription_deletion",
-                "policy_definition": "false",  # No one can delete
-                "policy_operation": "DELETE"
-            }
-        ).execute()
+        # Enable RLS and (re)create all policies in a single round trip
+        supabase.rpc("exec_sql", {"sql": _RLS_POLICIES_SQL}).execute()
         
         return True
     except Exception as e:
@@ -3,19 +3,33 @@ Security Logging and Monitoring Module for Owaiken
 Implements comprehensive security event logging and monitoring
 """
 import os
+import re
+import gzip
 import json
-import uuid
 import time
+import queue
+import atexit
 import logging
+import logging.handlers
+import threading
 import traceback
 import socket
 import hashlib
-import requests
+import secrets
+import contextlib
+import contextvars
+import msgspec
 import streamlit as st
+from functools import lru_cache, partial
 from typing import Dict, Any, List, Optional, Union, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # Security event types
 class SecurityEventType(str, Enum):
     """Security event types for classification and filtering"""
@@ -52,6 +66,204 @@ class SecuritySeverity(str, Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+# Logging level used for each severity
+_SEVERITY_LEVELS = {
+    SecuritySeverity.CRITICAL: logging.CRITICAL,
+    SecuritySeverity.HIGH: logging.ERROR,
+    SecuritySeverity.MEDIUM: logging.WARNING,
+    SecuritySeverity.LOW: logging.INFO,
+    SecuritySeverity.INFO: logging.DEBUG,
+}
+
+# Key fragments that mark a field as PII, matched in a single regex scan
+_PII_PATTERN = re.compile(
+    "password|credit_card|ssn|social_security|address|phone|email|birth|secret"
+)
+
+@lru_cache(maxsize=4096)
+def _key_is_pii(key: str) -> bool:
+    """Whether a field name marks PII; the same keys recur on every event"""
+    return _PII_PATTERN.search(key.lower()) is not None
+
+def _mask_value(value: str) -> str:
+    """Mask with asterisks, keeping first and last characters"""
+    length = len(value)
+    if length > 4:
+        return f"{value[0]}{'*' * (length - 2)}{value[-1]}"
+    return "****"
+
+# Per-request context used when an event is logged without a user or IP;
+# only set inside a log_context() block
+_CTX_USER: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("user_id", default=None)
+_CTX_IP: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("source_ip", default=None)
+
+@contextlib.contextmanager
+def log_context(user_id: Optional[str] = None, source_ip: Optional[str] = None):
+    """
+    Record the user and source IP on events logged inside the block
+    
+    Applies only to events that do not pass their own values. Both values
+    are replaced for the block (None means no value) and restored when it
+    exits, so they never carry over to later events.
+    
+    Args:
+        user_id: User ID
+        source_ip: Source IP address
+    """
+    user_token = _CTX_USER.set(user_id)
+    ip_token = _CTX_IP.set(source_ip)
+    try:
+        yield
+    finally:
+        _CTX_IP.reset(ip_token)
+        _CTX_USER.reset(user_token)
+
+# Crockford base32 alphabet for ULIDs
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+def _ulid() -> str:
+    """Time-ordered ID: 48-bit millisecond timestamp plus 80 random bits, as 26 base32 chars"""
+    value = int.from_bytes(
+        int(time.time() * 1000).to_bytes(6, "big") + secrets.token_bytes(10),
+        "big"
+    )
+    return "".join([_CROCKFORD[(value >> shift) & 31] for shift in range(125, -1, -5)])
+
+# JSON encoder; events are built in a fixed key order, so its output is canonical
+_JSON_ENC = msgspec.json.Encoder()
+_MP_ENC = msgspec.msgpack.Encoder()
+
+# Maximum number of queued events written per batch
+_BATCH_SIZE = 256
+
+# External service uploads: events per request, max seconds an event waits,
+# and the body sizes above which uploads are zstd (if available) or gzip compressed
+_SERVICE_BATCH_SIZE = 200
+_SERVICE_FLUSH_INTERVAL = 0.25
+_SERVICE_ZSTD_THRESHOLD = 1024
+_SERVICE_GZIP_THRESHOLD = 4096
+_ZSTD_COMPRESSOR = zstandard.ZstdCompressor(level=3) if zstandard else None
+
+# fdatasync is Linux/Unix only; fall back to fsync elsewhere (macOS, Windows)
+_datasync = getattr(os, "fdatasync", os.fsync)
+
+class BatchAppendHandler(logging.Handler):
+    """
+    File handler that batches records into large appends
+    
+    Records are buffered and written with a single os.write when the
+    buffer fills or every flush interval, with an fdatasync every few
+    writes instead of a flush per record. The path may contain strftime
+    codes; a record from a later day closes the file and opens the next one.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        capacity: int = 131072,
+        flush_interval: float = 0.1,
+        sync_every: int = 10
+    ):
+        """
+        Open the log file for appending
+        
+        Args:
+            path: Log file path, optionally with strftime codes (e.g. %Y%m%d)
+            capacity: Buffer size in bytes that triggers a write
+            flush_interval: Seconds between background writes
+            sync_every: Number of writes between fdatasync calls
+        """
+        super().__init__()
+        self.path_pattern = path
+        self.fd = None
+        self._open(time.time())
+        self.buf = bytearray()
+        self.cap = capacity
+        self._sync_every = sync_every
+        self._writes = 0
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically,
+            args=(flush_interval,),
+            name="security_log_file_flusher",
+            daemon=True
+        )
+        self._flusher.start()
+    
+    def emit(self, record: logging.LogRecord):
+        """Buffer a formatted record, writing out when the buffer is full"""
+        try:
+            line = self.format(record).encode() + b"\n"
+        except Exception:
+            self.handleError(record)
+            return
+        
+        with self.lock:
+            if record.created >= self._rollover_at and self.fd is not None:
+                self._rollover(record.created)
+            self.buf += line
+            if len(self.buf) >= self.cap:
+                self._write_buffer()
+    
+    def _open(self, now: float):
+        """Open the file for the day of now; caller holds the handler lock (or is __init__)"""
+        self.path = time.strftime(self.path_pattern, time.localtime(now))
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        
+        # Next local midnight
+        day_start = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._rollover_at = (day_start + timedelta(days=1)).timestamp()
+    
+    def _rollover(self, now: float):
+        """Write out the previous day's records and switch files; caller holds the handler lock"""
+        self._write_buffer()
+        _datasync(self.fd)
+        os.close(self.fd)
+        self._open(now)
+    
+    def _write_buffer(self):
+        """Write and clear the buffer; caller holds the handler lock"""
+        if not self.buf or self.fd is None:
+            return
+        
+        os.write(self.fd, self.buf)
+        self.buf.clear()
+        
+        self._writes += 1
+        if self._writes % self._sync_every == 0:
+            _datasync(self.fd)
+    
+    def _flush_periodically(self, interval: float):
+        """Background thread: write the buffer every interval until closed"""
+        while not self._closed.wait(interval):
+            self.flush()
+    
+    def flush(self):
+        """Write any buffered records"""
+        with self.lock:
+            self._write_buffer()
+    
+    def close(self):
+        """Write remaining records, sync and close the file"""
+        self._closed.set()
+        with self.lock:
+            self._write_buffer()
+            if self.fd is not None:
+                _datasync(self.fd)
+                os.close(self.fd)
+                self.fd = None
+        super().close()
+
+class _MarkerQueueListener(logging.handlers.QueueListener):
+    """QueueListener that releases flush markers once every record before them is handled"""
+    
+    def handle(self, record):
+        """Handle a record, or set a threading.Event marker"""
+        if isinstance(record, threading.Event):
+            record.set()
+            return
+        super().handle(record)
+
 # Configure logging
 class SecurityLogger:
     """
@@ -74,7 +286,8 @@ class SecurityLogger:
         log_to_service: bool = False,
         log_dir: Optional[str] = None,
         log_service_url: Optional[str] = None,
-        log_service_key: Optional[str] = None
+        log_service_key: Optional[str] = None,
+        log_wire_format: str = "json"
     ):
         """
         Initialize security logger
@@ -88,12 +301,16 @@ class SecurityLogger:
             log_dir: Directory for log files
             log_service_url: URL for external logging service
             log_service_key: API key for external logging service
+            log_wire_format: Upload format for the external service, "json"
+                (NDJSON) or "msgpack" (length-prefixed MessagePack frames)
         """
         self.app_name = app_name
         self.host_name = socket.gethostname()
+        self._static_prefix = {"app": app_name, "host": self.host_name}
         self.log_to_file = log_to_file
         self.log_to_console = log_to_console
         self.log_to_service = log_to_service
+        self.log_wire_format = log_wire_format
         
         # Set up logging
         self.logger = logging.getLogger(f"{app_name}_security")
@@ -104,6 +321,9 @@ class SecurityLogger:
         for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
         
+        # Output handlers run on a queue listener thread, not on the logging thread
+        handlers = []
+        
         # Add console handler if enabled
         if log_to_console:
             console_handler = logging.StreamHandler()
@@ -112,7 +332,7 @@ class SecurityLogger:
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
             console_handler.setFormatter(console_formatter)
-            self.logger.addHandler(console_handler)
+            handlers.append(console_handler)
         
         # Add file handler if enabled
         if log_to_file:
@@ -122,19 +342,30 @@ class SecurityLogger:
             # Create logs directory if it doesn't exist
             os.makedirs(log_dir, exist_ok=True)
             
-            # Create log file with date
+            # Dated log file; the handler moves to a new file each day.
+            # Literal '%' is escaped so only the date codes are expanded
             log_file = os.path.join(
-                log_dir, 
-                f"{app_name}_security_{datetime.now().strftime('%Y%m%d')}.log"
+                log_dir.replace("%", "%%"),
+                f"{app_name.replace('%', '%%')}_security_%Y%m%d.log"
             )
             
-            file_handler = logging.FileHandler(log_file)
+            file_handler = BatchAppendHandler(log_file)
             file_handler.setLevel(log_level)
             file_formatter = logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
             file_handler.setFormatter(file_formatter)
-            self.logger.addHandler(file_handler)
+            handlers.append(file_handler)
+        
+        self._listener = None
+        if handlers:
+            listener_queue = queue.SimpleQueue()
+            self._listener = _MarkerQueueListener(
+                listener_queue, *handlers, respect_handler_level=True
+            )
+            self.logger.addHandler(logging.handlers.QueueHandler(listener_queue))
+            self._listener.start()
+            atexit.register(self._listener.stop)
         
         # Set up external logging service
         if log_to_service:
@@ -150,95 +381,145 @@ class SecurityLogger:
             if not self.log_service_url or not self.log_service_key:
                 self.log_to_service = False
                 self.logger.warning("External logging service not configured properly")
+            else:
+                # Imported here so loggers without a service never load an HTTP client
+                import urllib3
+                
+                # Connection pool so uploads reuse connections instead of reconnecting
+                self._pool = urllib3.PoolManager(
+                    num_pools=2,
+                    maxsize=32,
+                    retries=urllib3.Retry(total=2, backoff_factor=0.1)
+                )
+        
+        # Events are queued by callers and written by a background thread
+        self._queue = queue.SimpleQueue()
+        # Encoded records waiting for the next external service upload (writer thread only)
+        self._out_buf: List[bytes] = []
+        # Hash of the last written entry; each entry's hash chains onto it (writer thread only)
+        self._prev_hash = b""
+        self._writer = threading.Thread(
+            target=self._drain_queue,
+            name=f"{app_name}_security_log_writer",
+            daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.flush)
+        
+        # Emitters for the highest-volume events with type, severity and level baked in
+        self._emit_login_ok = self._event_emitter(SecurityEventType.LOGIN_SUCCESS, SecuritySeverity.INFO)
+        self._emit_login_fail = self._event_emitter(SecurityEventType.LOGIN_FAILURE, SecuritySeverity.MEDIUM)
+        self._emit_mfa_ok = self._event_emitter(SecurityEventType.MFA_CHALLENGE_SUCCESS, SecuritySeverity.INFO)
+        self._emit_mfa_fail = self._event_emitter(SecurityEventType.MFA_CHALLENGE_FAILURE, SecuritySeverity.MEDIUM)
+        self._emit_rate_limited = self._event_emitter(SecurityEventType.RATE_LIMIT_EXCEEDED, SecuritySeverity.MEDIUM)
     
     def _mask_pii(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Mask personally identifiable information (PII)
         
+        Dicts and lists are only copied along paths that contain PII;
+        anything without PII is returned as-is rather than copied.
+        
         Args:
             data: Data dictionary
             
         Returns:
             Data with PII masked
         """
-        # Create a copy to avoid modifying the original
-        masked_data = data.copy()
-        
-        # PII fields to mask
-        pii_fields = [
-            "password", "credit_card", "ssn", "social_security", 
-            "address", "phone", "email", "birth", "secret"
-        ]
-        
-        # Mask PII fields
-        for key in masked_data:
-            lower_key = key.lower()
-            
+        masked_data = None
+        
+        for key, value in data.items():
             # Check if key contains any PII field name
-            if any(pii in lower_key for pii in pii_fields):
-                if isinstance(masked_data[key], str):
-                    # Mask with asterisks, keeping first and last characters
-                    if len(masked_data[key]) > 4:
-                        masked_data[key] = masked_data[key][0] + "*" * (len(masked_data[key]) - 2) + masked_data[key][-1]
-                    else:
-                        masked_data[key] = "****"
+            if _key_is_pii(key):
+                masked_value = _mask_value(value) if isinstance(value, str) else value
             
             # Recursively mask nested dictionaries
-            elif isinstance(masked_data[key], dict):
-                masked_data[key] = self._mask_pii(masked_data[key])
+            elif isinstance(value, dict):
+                masked_value = self._mask_pii(value)
             
             # Mask PII in lists of dictionaries
-            elif isinstance(masked_data[key], list):
-                masked_data[key] = [
-                    self._mask_pii(item) if isinstance(item, dict) else item
-                    for item in masked_data[key]
-                ]
+            elif isinstance(value, list):
+                masked_value = self._mask_pii_list(value)
+            
+            else:
+                continue
+            
+            # Copy on first change to avoid modifying the original
+            if masked_value is not value:
+                if masked_data is None:
+                    masked_data = data.copy()
+                masked_data[key] = masked_value
+        
+        return data if masked_data is None else masked_data
+    
+    def _mask_pii_list(self, items: List[Any]) -> List[Any]:
+        """Mask PII in the dictionaries of a list, copying only if something changed"""
+        masked_items = [self._mask_pii(item) if isinstance(item, dict) else item for item in items]
         
-        return masked_data
+        if any(masked is not item for masked, item in zip(masked_items, items)):
+            return masked_items
+        return items
     
-    def _calculate_log_hash(self, log_data: Dict[str, Any]) -> str:
+    def _calculate_log_hash(self, payload: bytes) -> str:
         """
         Calculate tamper-evident hash for log entry
         
+        Each hash covers the previous entry's hash followed by this
+        payload, so editing or removing any entry breaks the chain.
+        
         Args:
-            log_data: Log data dictionary
+            payload: Encoded log data (without the hash)
             
         Returns:
-            SHA-256 hash of log data
+            SHA-256 hash of the previous hash and log data
         """
-        # Sort keys for consistent hashing
-        serialized = json.dumps(log_data, sort_keys=True)
-        
-        # Calculate SHA-256 hash
-        return hashlib.sha256(serialized.encode()).hexdigest()
+        digest = hashlib.sha256(self._prev_hash)
+        digest.update(payload)
+        log_hash = digest.hexdigest()
+        self._prev_hash = log_hash.encode()
+        return log_hash
     
-    def _send_to_external_service(self, log_data: Dict[str, Any]) -> bool:
+    def _send_to_external_service(self) -> bool:
         """
-        Send log to external logging service
+        Send buffered logs to external logging service as one upload
         
-        Args:
-            log_data: Log data dictionary
-            
         Returns:
             True if successful, False otherwise
         """
-        if not self.log_to_service:
+        if not self.log_to_service or not self._out_buf:
             return False
         
+        records, self._out_buf = self._out_buf, []
+        
         try:
+            if self.log_wire_format == "msgpack":
+                content_type = "application/msgpack"
+                body = b"".join(records)
+            else:
+                content_type = "application/x-ndjson"
+                body = b"\n".join(records) + b"\n"
+            
             headers = {
-                "Content-Type": "application/json",
+                "Content-Type": content_type,
                 "Authorization": f"Bearer {self.log_service_key}"
             }
             
-            response = requests.post(
+            if _ZSTD_COMPRESSOR and len(body) > _SERVICE_ZSTD_THRESHOLD:
+                body = _ZSTD_COMPRESSOR.compress(body)
+                headers["Content-Encoding"] = "zstd"
+            elif len(body) > _SERVICE_GZIP_THRESHOLD:
+                body = gzip.compress(body, compresslevel=1)
+                headers["Content-Encoding"] = "gzip"
+            
+            response = self._pool.request(
+                "POST",
                 self.log_service_url,
+                body=body,
                 headers=headers,
-                json=log_data,
                 timeout=5  # 5 second timeout
             )
             
-            return response.status_code == 200
+            return response.status == 200
         except Exception as e:
             self.logger.error(f"Failed to send log to external service: {str(e)}")
             return False
@@ -257,9 +538,53 @@ class SecurityLogger:
         
         Args:
             event_type: Type of security event
-            user_id: User ID (optional)
+            user_id: User ID (defaults to the log context)
             severity: Severity level
             details: Additional details
+            source_ip: Source IP address (defaults to the log context)
+            mask_pii: Whether to mask PII
+            
+        Returns:
+            Log entry ID
+        """
+        return self._enqueue_event(
+            _SEVERITY_LEVELS.get(severity, logging.DEBUG),
+            event_type.value,
+            severity.value,
+            user_id,
+            details,
+            source_ip,
+            mask_pii
+        )
+    
+    def _event_emitter(self, event_type: SecurityEventType, severity: SecuritySeverity):
+        """Bind the level, event type and severity of an event ahead of time"""
+        return partial(
+            self._enqueue_event,
+            _SEVERITY_LEVELS.get(severity, logging.DEBUG),
+            event_type.value,
+            severity.value
+        )
+    
+    def _enqueue_event(
+        self,
+        level: int,
+        event_type: str,
+        severity: str,
+        user_id: Optional[str],
+        details: Optional[Dict[str, Any]],
+        source_ip: Optional[str],
+        mask_pii: bool = True
+    ) -> str:
+        """
+        Build an event and queue it for the writer thread
+        
+        Args:
+            level: Logging level
+            event_type: Event type value
+            severity: Severity value
+            user_id: User ID
+            details: Additional details
             source_ip: Source IP address
             mask_pii: Whether to mask PII
             
@@ -267,48 +592,174 @@ class SecurityLogger:
             Log entry ID
         """
         # Generate log entry ID
-        log_id = str(uuid.uuid4())
+        log_id = _ulid()
+        
+        # Nothing would be written or sent at this level
+        if not self.log_to_service and not self.logger.isEnabledFor(level):
+            return log_id
         
-        # Create log data
+        # Create log data; the timestamp is captured here and formatted on the writer thread
         log_data = {
             "id": log_id,
-            "timestamp": datetime.now().isoformat(),
-            "app": self.app_name,
-            "host": self.host_name,
+            "timestamp": time.time(),
+            **self._static_prefix,
             "event_type": event_type,
             "severity": severity,
-            "user_id": user_id,
-            "source_ip": source_ip,
-            "details": details or {}
+            "user_id": _CTX_USER.get() if user_id is None else user_id,
+            "source_ip": _CTX_IP.get() if source_ip is None else source_ip,
+            "details": dict(details) if details else {}
         }
         
+        # Masking, hashing and output happen on the writer thread
+        self._queue.put((level, log_data, mask_pii))
+        
+        return log_id
+    
+    def _write_event(self, level: int, log_data: Dict[str, Any], mask_pii: bool):
+        """
+        Mask, hash and output a single queued event
+        
+        Args:
+            level: Logging level
+            log_data: Log data dictionary
+            mask_pii: Whether to mask PII
+        """
+        log_data["timestamp"] = datetime.fromtimestamp(log_data["timestamp"]).isoformat()
+        
         # Mask PII if enabled
         if mask_pii:
             log_data = self._mask_pii(log_data)
         
-        # Add tamper-evident hash
-        log_data["hash"] = self._calculate_log_hash(log_data)
-        
-        # Convert to JSON
-        log_json = json.dumps(log_data)
-        
-        # Log based on severity
-        if severity == SecuritySeverity.CRITICAL:
-            self.logger.critical(log_json)
-        elif severity == SecuritySeverity.HIGH:
-            self.logger.error(log_json)
-        elif severity == SecuritySeverity.MEDIUM:
-            self.logger.warning(log_json)
-        elif severity == SecuritySeverity.LOW:
-            self.logger.info(log_json)
-        else:
-            self.logger.debug(log_json)
-        
-        # Send to external service if enabled
+        # Encode once, hash those bytes, then splice the hash into the same payload;
+        # the resulting record is reused for the log line and the upload
+        payload = _JSON_ENC.encode(log_data)
+        log_hash = self._calculate_log_hash(payload)
+        # _prev_hash now holds this entry's hash already encoded
+        record = payload[:-1] + b',"hash":"' + self._prev_hash + b'"}'
+        
+        # Log based on severity (events may be queued only for the service)
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, record.decode())
+        
+        # Buffer for the next external service upload
         if self.log_to_service:
-            self._send_to_external_service(log_data)
+            if self.log_wire_format == "msgpack":
+                # 4-byte big-endian length prefix per MessagePack frame
+                log_data["hash"] = log_hash
+                frame = _MP_ENC.encode(log_data)
+                self._out_buf.append(len(frame).to_bytes(4, "big") + frame)
+            else:
+                self._out_buf.append(record)
+    
+    def _drain_queue(self):
+        """Writer thread: write queued events in batches"""
+        # When the oldest buffered upload record must be sent by (None if nothing is buffered)
+        upload_deadline = None
+        
+        while True:
+            # Wake up by the upload deadline if an upload is pending
+            timeout = None if upload_deadline is None else max(0.0, upload_deadline - time.monotonic())
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                self._send_to_external_service()
+                upload_deadline = None
+                continue
+            
+            received = time.monotonic()
+            while len(batch) < _BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for entry in batch:
+                # close() sentinel: send what is buffered and stop the thread
+                if entry is None:
+                    self._send_to_external_service()
+                    return
+                
+                # flush() markers are released once everything before them is written and sent
+                if isinstance(entry, threading.Event):
+                    self._send_to_external_service()
+                    entry.set()
+                    continue
+                
+                try:
+                    self._write_event(*entry)
+                except Exception as e:
+                    self.logger.error(f"Failed to write security event: {str(e)}")
+            
+            if not self._out_buf:
+                upload_deadline = None
+                continue
+            
+            # The buffer was empty before this batch, so its oldest record arrived with it
+            if upload_deadline is None:
+                upload_deadline = received + _SERVICE_FLUSH_INTERVAL
+            
+            # Send when the batch is full or the oldest record has waited long enough,
+            # even if events keep arriving faster than the flush interval
+            if len(self._out_buf) >= _SERVICE_BATCH_SIZE or time.monotonic() >= upload_deadline:
+                self._send_to_external_service()
+                upload_deadline = None
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until all queued events have been written
         
-        return log_id
+        Args:
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if the queue was drained in time
+        """
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        self._queue.put(done)
+        if not done.wait(timeout):
+            return False
+        
+        # A second marker behind the writer's records, released by the listener thread
+        # once it has handed them all to the output handlers
+        if self._listener:
+            handled = threading.Event()
+            self._listener.queue.put(handled)
+            if not handled.wait(max(0.0, deadline - time.monotonic())):
+                return False
+            
+            for handler in self._listener.handlers:
+                handler.flush()
+        
+        return True
+    
+    def close(self, timeout: float = 5.0):
+        """
+        Flush queued events, stop the background threads and close the output handlers
+        
+        Args:
+            timeout: Maximum seconds to wait for the flush and the writer thread
+        """
+        self.flush(timeout)
+        atexit.unregister(self.flush)
+        
+        # Stop the writer thread
+        self._queue.put(None)
+        self._writer.join(timeout)
+        
+        # Stop the listener thread, then close its handlers (the file handler's flusher and fd)
+        if self._listener:
+            self._listener.stop()
+            atexit.unregister(self._listener.stop)
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+        
+        for handler in self.logger.handlers[:]:
+            self.logger.removeHandler(handler)
+        
+        if self.log_to_service:
+            self._pool.clear()
     
     def log_login_attempt(
         self,
@@ -329,16 +780,9 @@ class SecurityLogger:
         Returns:
             Log entry ID
         """
-        event_type = SecurityEventType.LOGIN_SUCCESS if success else SecurityEventType.LOGIN_FAILURE
-        severity = SecuritySeverity.INFO if success else SecuritySeverity.MEDIUM
+        emit = self._emit_login_ok if success else self._emit_login_fail
         
-        return self.log_security_event(
-            event_type=event_type,
-            user_id=user_id,
-            severity=severity,
-            details=details,
-            source_ip=source_ip
-        )
+        return emit(user_id, details, source_ip)
     
     def log_mfa_attempt(
         self,
@@ -361,19 +805,12 @@ class SecurityLogger:
         Returns:
             Log entry ID
         """
-        event_type = SecurityEventType.MFA_CHALLENGE_SUCCESS if success else SecurityEventType.MFA_CHALLENGE_FAILURE
-        severity = SecuritySeverity.INFO if success else SecuritySeverity.MEDIUM
+        emit = self._emit_mfa_ok if success else self._emit_mfa_fail
         
         details = details or {}
         details["mfa_method"] = method
         
-        return self.log_security_event(
-            event_type=event_type,
-            user_id=user_id,
-            severity=severity,
-            details=details,
-            source_ip=source_ip
-        )
+        return emit(user_id, details, source_ip)
     
     def log_subscription_event(
         self,
@@ -434,13 +871,7 @@ class SecurityLogger:
             "window": window
         }
         
-        return self.log_security_event(
-            event_type=SecurityEventType.RATE_LIMIT_EXCEEDED,
-            user_id=user_id,
-            severity=SecuritySeverity.MEDIUM,
-            details=details,
-            source_ip=source_ip
-        )
+        return self._emit_rate_limited(user_id, details, source_ip)
     
     def log_suspicious_activity(
         self,
@@ -474,20 +905,43 @@ class SecurityLogger:
             source_ip=source_ip
         )
 
+# Process-wide logger shared by all sessions
+_LOGGER_SINGLETON: Optional[SecurityLogger] = None
+_LOCK = threading.Lock()
+
 # Get security logger instance
-def get_security_logger():
-    """Get or create the security logger instance"""
-    if "security_logger" not in st.session_state:
-        # Get configuration from environment or secrets
-        log_to_file = st.secrets.get("SECURITY_LOG_TO_FILE", os.environ.get("SECURITY_LOG_TO_FILE", "true")).lower() == "true"
-        log_to_console = st.secrets.get("SECURITY_LOG_TO_CONSOLE", os.environ.get("SECURITY_LOG_TO_CONSOLE", "true")).lower() == "true"
-        log_to_service = st.secrets.get("SECURITY_LOG_TO_SERVICE", os.environ.get("SECURITY_LOG_TO_SERVICE", "false")).lower() == "true"
-        
-        # Create logger
-        st.session_state.security_logger = SecurityLogger(
-            log_to_file=log_to_file,
-            log_to_console=log_to_console,
-            log_to_service=log_to_service
-        )
+def get_security_logger() -> SecurityLogger:
+    """Get or create the security logger instance (shared per process)"""
+    global _LOGGER_SINGLETON
+    
+    # Lock-free read once the logger exists
+    logger = _LOGGER_SINGLETON
+    if logger is not None:
+        return logger
+    
+    with _LOCK:
+        if _LOGGER_SINGLETON is None:
+            # Get configuration from environment or secrets
+            log_to_file = st.secrets.get("SECURITY_LOG_TO_FILE", os.environ.get("SECURITY_LOG_TO_FILE", "true")).lower() == "true"
+            log_to_console = st.secrets.get("SECURITY_LOG_TO_CONSOLE", os.environ.get("SECURITY_LOG_TO_CONSOLE", "true")).lower() == "true"
+            log_to_service = st.secrets.get("SECURITY_LOG_TO_SERVICE", os.environ.get("SECURITY_LOG_TO_SERVICE", "false")).lower() == "true"
+            log_wire_format = st.secrets.get("SECURITY_LOG_WIRE_FORMAT", os.environ.get("SECURITY_LOG_WIRE_FORMAT", "json")).lower()
+            
+            # Create logger
+            _LOGGER_SINGLETON = SecurityLogger(
+                log_to_file=log_to_file,
+                log_to_console=log_to_console,
+                log_to_service=log_to_service,
+                log_wire_format=log_wire_format
+            )
+        
+        return _LOGGER_SINGLETON
+
+def reset_for_tests():
+    """Close and drop the shared logger so the next call creates a fresh one"""
+    global _LOGGER_SINGLETON
     
-    return st.session_state.security_logger
+    with _LOCK:
+        if _LOGGER_SINGLETON is not None:
+            _LOGGER_SINGLETON.close()
+        _LOGGER_SINGLETON = None
@@ -7,13 +7,33 @@ import streamlit as st
 from typing import Dict, Any, List, Optional, Union, Callable
 
 # Import all security modules
-from streamlit_pages.rate_limiting import get_rate_limiter, OwaikanRateLimiter
+from streamlit_pages.rate_limiting import (
+    get_rate_limiter, OwaikanRateLimiter, RATE_LIMIT_MINUTE, RATE_LIMIT_HOUR
+)
 from streamlit_pages.mfa_support import get_mfa_manager, MFAManager
 from streamlit_pages.prepared_statements import get_prepared_statement_manager, PreparedStatementManager
 from streamlit_pages.security_logging import get_security_logger, SecurityLogger, SecurityEventType, SecuritySeverity
 from streamlit_pages.https_enforcement import setup_security_headers
 from streamlit_pages.security_config import initialize_database_security
 
+# Bits returned by _suspicious_rules for each triggered detection rule
+_RULE_RAPID_ACTIONS = 1
+_RULE_UNUSUAL_LOCATION = 2
+
+def _suspicious_rules(action_count: int, time_window: int, unusual_location: bool) -> int:
+    """Evaluate the numeric detection rules, returning a bitmask of triggered rules"""
+    flags = 0
+    
+    # Rapid succession of actions
+    if action_count > 20 and time_window < 10:
+        flags |= _RULE_RAPID_ACTIONS
+    
+    # Unusual access patterns
+    if unusual_location:
+        flags |= _RULE_UNUSUAL_LOCATION
+    
+    return flags
+
 class SecurityManager:
     """
     Comprehensive Security Manager for Owaiken
@@ -70,15 +90,19 @@ class SecurityManager:
         # Log rate limit exceeded events
         if result["is_limited"]:
             window = "minute" if result["minute_limited"] else "hour" if result["hour_limited"] else "day"
-            self.security_logger.log_rate_limit_exceeded(
-                user_id=user_id,
-                endpoint=endpoint,
-                limit=self.rate_limiter.tier_limits[tier][window],
-                window=window
-            )
+            self._log_rate_limit_exceeded(user_id, tier, endpoint, window)
         
         return result
     
+    def _log_rate_limit_exceeded(self, user_id: str, tier: str, endpoint: str, window: str):
+        """Log a rate limit exceeded event for the first exceeded window"""
+        self.security_logger.log_rate_limit_exceeded(
+            user_id=user_id,
+            endpoint=endpoint,
+            limit=self.rate_limiter.tier_limits[tier][window],
+            window=window
+        )
+    
     def secure_function(
         self,
         rate_limit_tier: str = "free",
@@ -108,17 +132,18 @@ class SecurityManager:
                 # Get user ID from session
                 user_id = st.session_state.get("user_id", "anonymous")
                 
-                # Check rate limits
-                rate_limit_result = self.rate_limit(user_id, rate_limit_tier, endpoint_name)
-                if rate_limit_result["is_limited"]:
+                # Check rate limits; the result is only expanded when a limit was hit
+                flags = self.rate_limiter.check_rate_limit_fast(user_id, rate_limit_tier)
+                if flags:
+                    window = "minute" if flags & RATE_LIMIT_MINUTE else "hour" if flags & RATE_LIMIT_HOUR else "day"
+                    self._log_rate_limit_exceeded(user_id, rate_limit_tier, endpoint_name, window)
                     st.error("Rate limit exceeded. Please try again later.")
                     return None
                 
                 # Check MFA if required
                 if require_mfa and user_id != "anonymous":
                     # In a real implementation, check if user has completed MFA challenge
-                    mfa_verified = st.session_state.get("mfa_verified", False)
-                    if not mfa_verified:
+                    if not st.session_state.get("mfa_verified", False):
                         st.error("Multi-factor authentication required.")
                         return None
                 
@@ -175,27 +200,28 @@ class SecurityManager:
         """
         # Implement suspicious activity detection logic
         # This is a placeholder for a more sophisticated implementation
-        suspicious = False
+        flags = _suspicious_rules(
+            activity_data.get("action_count", 0),
+            activity_data.get("time_window", 60),
+            activity_data.get("unusual_location", False)
+        )
         
-        # Example: Check for rapid succession of actions
-        if activity_data.get("action_count", 0) > 20 and activity_data.get("time_window", 60) < 10:
-            suspicious = True
+        # Logging only happens for triggered rules
+        if flags & _RULE_RAPID_ACTIONS:
             self.security_logger.log_suspicious_activity(
                 user_id=user_id,
                 activity_type="rapid_actions",
                 details=activity_data
             )
         
-        # Example: Check for unusual access patterns
-        if activity_data.get("unusual_location", False):
-            suspicious = True
+        if flags & _RULE_UNUSUAL_LOCATION:
             self.security_logger.log_suspicious_activity(
                 user_id=user_id,
                 activity_type="unusual_location",
                 details=activity_data
             )
         
-        return suspicious
+        return flags != 0
 
 # Get security manager instance
 def get_security_manager():
@@ -5,15 +5,70 @@ This module provides modern UI components using the streamlit-shadcn-ui package.
 import streamlit as st
 from streamlit_shadcn_ui import button, card, input, select, switch, tabs
 
+# Static demo markup, sent as one element each instead of one per badge/avatar
+_BADGES_HTML = """
+<div style='display: flex; gap: 8px; flex-wrap: wrap;'>
+    <span style='background-color: #0284c7; color: white; padding: 4px 8px; border-radius: 4px;'>Default</span>
+    <span style='background-color: #6b7280; color: white; padding: 4px 8px; border-radius: 4px;'>Secondary</span>
+    <span style='border: 1px solid #6b7280; color: #6b7280; padding: 4px 8px; border-radius: 4px;'>Outline</span>
+    <span style='background-color: #ef4444; color: white; padding: 4px 8px; border-radius: 4px;'>Destructive</span>
+</div>
+"""
+
+_AVATARS_HTML = """
+<div style='display: flex; gap: 24px;'>
+    <div style='display: flex; flex-direction: column; align-items: center; gap: 4px;'>
+        <div style='background-color: #0284c7; color: white; width: 40px; height: 40px; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-weight: bold;'>U</div>
+        <small style='opacity: 0.6;'>User</small>
+    </div>
+    <div style='display: flex; flex-direction: column; align-items: center; gap: 4px;'>
+        <div style='background-color: #6b7280; color: white; width: 40px; height: 40px; border-radius: 4px; display: flex; align-items: center; justify-content: center; font-weight: bold;'>A</div>
+        <small style='opacity: 0.6;'>Admin</small>
+    </div>
+</div>
+"""
+
+# Options for the demo select, built once so the same object is passed on every rerun
+_DEMO_OPTIONS = (
+    {"label": "Option 1", "value": "option1"},
+    {"label": "Option 2", "value": "option2"},
+    {"label": "Option 3", "value": "option3"}
+)
+
 def shadcn_demo():
     """
     Demo page showing all available Shadcn UI components.
+    
+    Interactive sections are fragments, so using one only reruns that section.
     """
     st.title("Shadcn UI Components")
     
     # Basic components section
     st.header("Basic Components")
+    _basic_components()
+    
+    # Card component
+    st.header("Card Component")
+    _card_section()
+    
+    # Tabs component
+    st.header("Tabs Component")
+    _tabs_section()
     
+    # Alert component (using Streamlit native components instead)
+    st.header("Alert Components")
+    st.info("This is an informational alert.")
+    st.success("Success! Your changes have been saved.")
+    st.warning("Warning: This action cannot be undone.")
+    st.error("Error: Something went wrong.")
+    
+    # Notification examples (using Streamlit native components instead)
+    st.header("Notifications")
+    _notifications()
+
+@st.fragment
+def _basic_components():
+    """Buttons, inputs, switches, select, badges and avatars"""
     col1, col2 = st.columns(2)
     
     with col1:
@@ -41,45 +96,28 @@ def shadcn_demo():
     with col2:
         # Select examples
         st.subheader("Select Dropdown")
-        options = [
-            {"label": "Option 1", "value": "option1"},
-            {"label": "Option 2", "value": "option2"},
-            {"label": "Option 3", "value": "option3"}
-        ]
-        selected = select("Choose an option", options=options)
+        selected = select("Choose an option", options=_DEMO_OPTIONS)
         if selected:
             st.write(f"Selected: {selected}")
             
         # Badge examples (using Streamlit native components instead)
         st.subheader("Badges")
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.markdown("<span style='background-color: #0284c7; color: white; padding: 4px 8px; border-radius: 4px;'>Default</span>", unsafe_allow_html=True)
-        with col2:
-            st.markdown("<span style='background-color: #6b7280; color: white; padding: 4px 8px; border-radius: 4px;'>Secondary</span>", unsafe_allow_html=True)
-        with col3:
-            st.markdown("<span style='border: 1px solid #6b7280; color: #6b7280; padding: 4px 8px; border-radius: 4px;'>Outline</span>", unsafe_allow_html=True)
-        with col4:
-            st.markdown("<span style='background-color: #ef4444; color: white; padding: 4px 8px; border-radius: 4px;'>Destructive</span>", unsafe_allow_html=True)
+        st.markdown(_BADGES_HTML, unsafe_allow_html=True)
         
         # Avatar examples (using Streamlit native components instead)
         st.subheader("Avatars")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("<div style='background-color: #0284c7; color: white; width: 40px; height: 40px; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-weight: bold;'>U</div>", unsafe_allow_html=True)
-            st.caption("User")
-        with col2:
-            st.markdown("<div style='background-color: #6b7280; color: white; width: 40px; height: 40px; border-radius: 4px; display: flex; align-items: center; justify-content: center; font-weight: bold;'>A</div>", unsafe_allow_html=True)
-            st.caption("Admin")
-    
-    # Card component
-    st.header("Card Component")
+        st.markdown(_AVATARS_HTML, unsafe_allow_html=True)
+
+@st.fragment
+def _card_section():
+    """Card with a call-to-action button"""
     with card(title="Owaiken Features", description="Explore the powerful features of Owaiken"):
         st.write("Owaiken provides a comprehensive set of tools for building AI agents.")
         button("Learn More", variant="primary")
-    
-    # Tabs component
-    st.header("Tabs Component")
+
+@st.fragment
+def _tabs_section():
+    """Tabs with the active tab's content"""
     tab_content = tabs(
         {
             "Account": "Manage your account settings and preferences.",
@@ -88,16 +126,10 @@ def shadcn_demo():
         }
     )
     st.write(f"Active tab content: {tab_content}")
-    
-    # Alert component (using Streamlit native components instead)
-    st.header("Alert Components")
-    st.info("This is an informational alert.")
-    st.success("Success! Your changes have been saved.")
-    st.warning("Warning: This action cannot be undone.")
-    st.error("Error: Something went wrong.")
-    
-    # Notification examples (using Streamlit native components instead)
-    st.header("Notifications")
+
+@st.fragment
+def _notifications():
+    """Buttons that show a notification when clicked"""
     if button("Show Success Notification", variant="primary"):
         st.success("Operation completed successfully.")
     
@@ -156,44 +188,49 @@ def shadcn_card_section(title, content, actions=None):
                             else:
                                 action['on_click']()
 
-def shadcn_form(fields, submit_label="Submit", on_submit=None):
+def shadcn_form(fields, submit_label="Submit", on_submit=None, form_key="owaiken_form"):
     """
     Creates a form with Shadcn UI components.
     
+    Fields are rendered inside st.form, so changing them does not rerun
+    the script; one rerun happens on submit.
+    
     Args:
         fields: List of dictionaries with field configurations
         submit_label: Label for the submit button
         on_submit: Function to call on form submission
+        form_key: Unique key for the form
         
     Returns:
         dict: Form values if submitted, None otherwise
     """
     form_values = {}
     
-    for field in fields:
-        field_type = field.get('type', 'input')
-        field_id = field.get('id', '')
-        label = field.get('label', '')
+    with st.form(key=form_key):
+        for field in fields:
+            field_type = field.get('type', 'input')
+            field_id = field.get('id', '')
+            label = field.get('label', '')
+            
+            if field_type == 'input':
+                form_values[field_id] = input(
+                    label, 
+                    placeholder=field.get('placeholder', ''),
+                    type=field.get('input_type', 'text')
+                )
+            elif field_type == 'select':
+                form_values[field_id] = select(
+                    label,
+                    options=field.get('options', []),
+                    placeholder=field.get('placeholder', 'Select an option')
+                )
+            elif field_type == 'switch':
+                form_values[field_id] = switch(
+                    label,
+                    checked=field.get('default', False)
+                )
         
-        if field_type == 'input':
-            form_values[field_id] = input(
-                label, 
-                placeholder=field.get('placeholder', ''),
-                type=field.get('input_type', 'text')
-            )
-        elif field_type == 'select':
-            form_values[field_id] = select(
-                label,
-                options=field.get('options', []),
-                placeholder=field.get('placeholder', 'Select an option')
-            )
-        elif field_type == 'switch':
-            form_values[field_id] = switch(
-                label,
-                checked=field.get('default', False)
-            )
-    
-    submitted = button(submit_label, variant="primary")
+        submitted = st.form_submit_button(submit_label, type="primary")
     
     if submitted:
         if on_submit:
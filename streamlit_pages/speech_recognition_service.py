@@ -3,20 +3,21 @@ Speech Recognition Service for Owaiken
 Uses OpenAI Whisper API for speech-to-text conversion
 """
 import streamlit as st
-import tempfile
 import os
-import base64
-import requests
-import json
-import time
-import secrets
-import stat
+import io
+import binascii
+import asyncio
+import hashlib
+import threading
+from functools import lru_cache
 from pathlib import Path
-import openai
-from dotenv import load_dotenv
+from cachetools import LRUCache
 
-# Load environment variables
-load_dotenv()
+@lru_cache(maxsize=1)
+def _load_env():
+    """Load environment variables from .env once, on the first secret lookup"""
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Security-focused functions for accessing sensitive data
 def get_secret(key, default=None):
@@ -25,6 +26,8 @@ def get_secret(key, default=None):
     Prioritizes environment variables over secrets.toml for production security
     """
     try:
+        _load_env()
+        
         # First try to get from environment variables (more secure for production)
         env_value = os.getenv(key)
         if env_value:
@@ -42,19 +45,39 @@ def sanitize_input(input_data):
         return input_data.replace("<", "&lt;").replace(">", "&gt;")
     return input_data
 
+# Demo transcripts by audio duration: (exclusive upper bound in seconds, text)
+_SIMULATED_TRANSCRIPTS = (
+    (2, "Hello there."),
+    (5, "I'd like to create a workflow for automating email responses."),
+    (float("inf"), "Please create an N8N workflow that monitors my Gmail inbox and automatically categorizes emails based on their content. When an important email arrives, I want to receive a notification on my phone."),
+)
+
 class SpeechRecognitionService:
     """
     Service for converting speech to text using OpenAI's Whisper API
     """
     def __init__(self):
         # Initialize OpenAI client with security best practices
+        # openai is imported on first use so importing this module stays cheap
+        import openai
+        
+        self.client = None
+        self._async_client = None
+        
+        # (audio sha256, language) -> transcript, so re-submitted clips skip the API
+        self._transcripts = LRUCache(maxsize=64)
+        self._transcripts_lock = threading.Lock()
+        
         try:
             # Try multiple sources for the API key (env vars preferred for production)
             self.api_key = os.getenv("OPENAI_API_KEY") or get_secret("OPENAI_API_KEY")
             
             # Set the API key if available
             if self.api_key:
-                openai.api_key = self.api_key
+                # One client for the service lifetime, pooling connections across requests
+                self.client = openai.OpenAI(api_key=self.api_key)
+                # Async client for callers running their own long-lived event loop
+                self._async_client = openai.AsyncOpenAI(api_key=self.api_key)
                 # Don't log success with actual key values in production
                 print("OpenAI API key configured successfully")
             else:
@@ -63,18 +86,6 @@ class SpeechRecognitionService:
             # Log error without exposing sensitive details
             print(f"Error initializing API configuration: {type(e).__name__}")
             self.api_key = None
-        
-        # Create a secure directory for temporary audio files
-        # Use a random subdirectory name for each session to prevent conflicts
-        random_dir = secrets.token_hex(8)
-        self.temp_dir = Path(tempfile.gettempdir()) / f"owaiken_audio_{random_dir}"
-        os.makedirs(self.temp_dir, exist_ok=True)
-        
-        # Set secure permissions on the temp directory
-        try:
-            os.chmod(self.temp_dir, stat.S_IRWXU)  # Owner only permissions (700)
-        except Exception as e:
-            print(f"Warning: Could not set secure permissions on temp directory: {type(e).__name__}")
     
     def transcribe_audio_data(self, audio_data_base64, language="en"):
         """
@@ -87,64 +98,159 @@ class SpeechRecognitionService:
         Returns:
             Transcribed text or error message
         """
-        temp_file = None
+        # Validate input
+        if not audio_data_base64 or not isinstance(audio_data_base64, str):
+            return "Error: Invalid audio data format"
+            
+        # Limit input size for security (prevent DOS attacks)
+        if len(audio_data_base64) > 10 * 1024 * 1024:  # 10MB limit
+            return "Error: Audio data exceeds size limit"
+        
+        try:
+            # Decode base64 audio data; binascii reads the ASCII string in place,
+            # where base64.b64decode would first copy it into a bytes object
+            audio_data = binascii.a2b_base64(audio_data_base64)
+        except Exception:
+            return "Error: Invalid audio data encoding"
+        
+        return self.transcribe_audio_bytes(audio_data, language)
+    
+    def transcribe_audio_bytes(self, audio_bytes, language="en"):
+        """
+        Transcribe raw audio bytes using OpenAI's Whisper API
+        
+        The bytes are sent from memory, without a temporary file.
+        
+        Args:
+            audio_bytes: Raw audio data (WAV)
+            language: Language code (default: "en" for English)
+            
+        Returns:
+            Transcribed text or error message
+        """
         try:
             # Check if API key is available
             if not self.api_key:
                 return "Error: API key not configured. Please contact your administrator."
             
-            # Validate input
-            if not audio_data_base64 or not isinstance(audio_data_base64, str):
-                return "Error: Invalid audio data format"
-                
-            # Limit input size for security (prevent DOS attacks)
-            if len(audio_data_base64) > 10 * 1024 * 1024:  # 10MB limit
-                return "Error: Audio data exceeds size limit"
+            error = self._check_audio_bytes(audio_bytes)
+            if error:
+                return error
+            
+            cache_key = (hashlib.sha256(audio_bytes).hexdigest(), language)
+            with self._transcripts_lock:
+                cached = self._transcripts.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            # Transcribe using OpenAI Whisper API
+            transcript = self.client.audio.transcriptions.create(
+                model="whisper-1",
+                file=self._audio_file(audio_bytes),
+                language=language
+            )
             
-            try:
-                # Decode base64 audio data
-                audio_data = base64.b64decode(audio_data_base64)
-            except Exception:
-                return "Error: Invalid audio data encoding"
+            # Sanitize output before returning (prevent XSS)
+            return self._remember_transcript(cache_key, sanitize_input(transcript.text))
+        
+        except Exception as e:
+            # Log the error type but not the full details (could contain sensitive info)
+            error_type = type(e).__name__
+            print(f"Transcription error: {error_type}")
+            return f"Error processing audio: Please try again"
+    
+    async def transcribe_audio_bytes_async(self, audio_bytes, language="en", client=None):
+        """
+        Transcribe raw audio bytes without blocking the event loop
+        
+        Args:
+            audio_bytes: Raw audio data (WAV)
+            language: Language code (default: "en" for English)
+            client: AsyncOpenAI client bound to the running loop (default: the service's client)
             
-            # Generate secure random filename
-            secure_filename = f"audio_{secrets.token_hex(16)}.wav"
-            temp_file = self.temp_dir / secure_filename
+        Returns:
+            Transcribed text or error message
+        """
+        client = client or self._async_client
+        try:
+            # Check if API key is available
+            if not client:
+                return "Error: API key not configured. Please contact your administrator."
             
-            # Save to temporary file with secure permissions
-            with open(temp_file, "wb") as f:
-                f.write(audio_data)
+            error = self._check_audio_bytes(audio_bytes)
+            if error:
+                return error
             
-            # Set secure permissions
-            os.chmod(temp_file, stat.S_IRUSR | stat.S_IWUSR)  # Owner read/write only (600)
+            cache_key = (hashlib.sha256(audio_bytes).hexdigest(), language)
+            with self._transcripts_lock:
+                cached = self._transcripts.get(cache_key)
+            if cached is not None:
+                return cached
             
             # Transcribe using OpenAI Whisper API
-            with open(temp_file, "rb") as audio_file:
-                transcript = openai.Audio.transcribe(
-                    model="whisper-1",
-                    file=audio_file,
-                    language=language
-                )
-            
-            # Get the transcribed text
-            transcribed_text = transcript.get("text", "")
+            transcript = await client.audio.transcriptions.create(
+                model="whisper-1",
+                file=self._audio_file(audio_bytes),
+                language=language
+            )
             
             # Sanitize output before returning (prevent XSS)
-            return sanitize_input(transcribed_text)
+            return self._remember_transcript(cache_key, sanitize_input(transcript.text))
         
         except Exception as e:
             # Log the error type but not the full details (could contain sensitive info)
             error_type = type(e).__name__
             print(f"Transcription error: {error_type}")
             return f"Error processing audio: Please try again"
+    
+    def transcribe_many(self, audio_clips, language="en"):
+        """
+        Transcribe several audio clips concurrently
         
-        finally:
-            # Always clean up temporary file, even if an exception occurred
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except Exception:
-                    pass  # Fail silently on cleanup errors
+        Args:
+            audio_clips: List of raw audio data (WAV)
+            language: Language code (default: "en" for English)
+            
+        Returns:
+            List of transcribed texts or error messages, in input order
+        """
+        async def _gather():
+            if not self.api_key:
+                return [await self.transcribe_audio_bytes_async(clip, language) for clip in audio_clips]
+            
+            import openai
+            
+            # A client per run, since its connections belong to this run's event loop
+            async with openai.AsyncOpenAI(api_key=self.api_key) as client:
+                return await asyncio.gather(
+                    *(self.transcribe_audio_bytes_async(clip, language, client) for clip in audio_clips)
+                )
+        
+        return asyncio.run(_gather())
+    
+    def _check_audio_bytes(self, audio_bytes):
+        """Return an error message if the audio bytes are invalid, otherwise None"""
+        # Validate input
+        if not audio_bytes or not isinstance(audio_bytes, (bytes, bytearray)):
+            return "Error: Invalid audio data format"
+        
+        # Same limit as the base64 path (10MB of base64 text)
+        if len(audio_bytes) > 10 * 1024 * 1024 * 3 // 4:
+            return "Error: Audio data exceeds size limit"
+        
+        return None
+    
+    def _remember_transcript(self, cache_key, text):
+        """Cache a successful transcript and return it"""
+        with self._transcripts_lock:
+            self._transcripts[cache_key] = text
+        return text
+    
+    def _audio_file(self, audio_bytes):
+        """Wrap audio bytes in a file object; the name tells the API the audio format"""
+        audio_file = io.BytesIO(audio_bytes)
+        audio_file.name = "audio.wav"
+        return audio_file
     
     def transcribe_audio_file(self, audio_file_path, language="en"):
         """
@@ -163,18 +269,19 @@ class SpeechRecognitionService:
                 return "Error: OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
             
             # Check if file exists
-            if not os.path.exists(audio_file_path):
+            audio_path = Path(audio_file_path)
+            if not audio_path.exists():
                 return f"Error: Audio file not found at {audio_file_path}"
             
             # Transcribe using OpenAI Whisper API
-            with open(audio_file_path, "rb") as audio_file:
-                transcript = openai.Audio.transcribe(
+            with audio_path.open("rb") as audio_file:
+                transcript = self.client.audio.transcriptions.create(
                     model="whisper-1",
                     file=audio_file,
                     language=language
                 )
             
-            return transcript.get("text", "")
+            return transcript.text
         
         except Exception as e:
             return f"Error transcribing audio: {str(e)}"
@@ -190,22 +297,17 @@ class SpeechRecognitionService:
             Simulated transcribed text
         """
         # Simulate different responses based on duration
-        if duration < 2:
-            return "Hello there."
-        elif duration < 5:
-            return "I'd like to create a workflow for automating email responses."
-        else:
-            return "Please create an N8N workflow that monitors my Gmail inbox and automatically categorizes emails based on their content. When an important email arrives, I want to receive a notification on my phone."
+        for max_duration, text in _SIMULATED_TRANSCRIPTS:
+            if duration < max_duration:
+                return text
 
 
-# Create a singleton instance
-speech_recognition_service = SpeechRecognitionService()
-
+@st.cache_resource
 def get_speech_recognition_service():
     """
-    Get the speech recognition service instance
+    Get the speech recognition service instance (created on first use, shared per process)
     """
-    return speech_recognition_service
+    return SpeechRecognitionService()
 
 
 def transcribe_audio(audio_data):
@@ -226,11 +328,6 @@ def transcribe_audio(audio_data):
         if not audio_data:
             return None
         
-        # Convert audio data to base64
-        import base64
-        audio_bytes = audio_data
-        base64_audio = base64.b64encode(audio_bytes).decode("utf-8")
-        
         # Check if we're in demo mode (no API key)
         if not service.api_key:
             # Return a simulated response
@@ -239,8 +336,10 @@ def transcribe_audio(audio_data):
             time.sleep(1)
             return service.simulate_transcription(5)
         
-        # Transcribe the audio
-        return service.transcribe_audio_data(base64_audio)
+        # Transcribe the audio; raw bytes are sent as-is, strings are base64
+        if isinstance(audio_data, (bytes, bytearray)):
+            return service.transcribe_audio_bytes(audio_data)
+        return service.transcribe_audio_data(audio_data)
     except Exception as e:
         print(f"Error transcribing audio: {e}")
         # Return a friendly error message
@@ -2,14 +2,34 @@
 This module contains the CSS styles for the Streamlit UI.
 """
 
+import re
 import streamlit as st
 
-def load_css():
-    """
-    Load the custom CSS styles for the Owaiken UI with theme support.
-    """
-    # Force light theme for better readability
-    st.markdown("""
+# Quoted strings (kept as-is), comments, whitespace around punctuation, other whitespace.
+# ':' is left out: the space in a descendant selector like ".stApp :hover" is significant
+_CSS_TOKEN_PATTERN = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')"
+    r"|\s*/\*.*?\*/"
+    r"|\s*([{};,>])(?:\s|/\*.*?\*/)*"
+    r"|(\s+)",
+    re.S
+)
+
+def _minify_token(match: re.Match) -> str:
+    """Replacement for one _CSS_TOKEN_PATTERN match"""
+    string, punctuation, space = match.groups()
+    if string is not None:
+        return string
+    if punctuation is not None:
+        return punctuation
+    return " " if space is not None else ""
+
+def _minify_css(css: str) -> str:
+    """Strip comments and collapse whitespace outside quoted strings"""
+    return _CSS_TOKEN_PATTERN.sub(_minify_token, css).strip()
+
+# Built and minified once at import; load_css only emits it
+_CSS = _minify_css("""
         <style>
         /* Force light theme with good contrast */
         :root {
@@ -26,8 +46,8 @@ def load_css():
             color: var(--text-color) !important;
         }
         
-        /* Make all text black for readability */
-        p, h1, h2, h3, h4, h5, h6, li, span, div {
+        /* Make remaining headings black for readability (other text uses the rule below) */
+        h4, h5, h6 {
             color: var(--text-color) !important;
         }
         
@@ -151,4 +171,12 @@ def load_css():
             outline: none !important;
         }
         </style>
-    """, unsafe_allow_html=True)
+    """)
+
+def load_css():
+    """
+    Load the custom CSS styles for the Owaiken UI with theme support.
+    """
+    # Force light theme for better readability
+    # Emitted on every run: Streamlit drops elements a rerun does not send again
+    st.markdown(_CSS, unsafe_allow_html=True)
@@ -6,27 +6,51 @@ import streamlit as st
 import os
 import json
 import uuid
-import qrcode
-from io import BytesIO
-import base64
 from datetime import datetime, timedelta
+from functools import lru_cache
 from streamlit_pages.auth_system import (
     get_current_user, 
-    check_subscription,
+    cached_check_subscription,
     create_subscription,
     display_login_ui,
     display_subscription_ui,
     auth_required
 )
 
+# Static installation steps as ready-made HTML, so no markdown parsing is needed
+_INSTALL_HTML = (
+    "<ol>"
+    "<li>Download the installer for your operating system</li>"
+    "<li>Run the installer and follow the on-screen instructions</li>"
+    "<li>Launch Owaiken Desktop</li>"
+    "<li>When prompted, enter your license key or scan the QR code above</li>"
+    "<li>Enjoy all the features of Owaiken on your desktop!</li>"
+    "</ol>"
+)
+
+@lru_cache(maxsize=64)
+def _fmt_exp(iso):
+    """Format an ISO expiry timestamp for display, e.g. 'January 01, 2026'"""
+    return datetime.fromisoformat(iso).strftime('%B %d, %Y')
+
+@st.cache_data(max_entries=128, show_spinner=False)
 def generate_license_key(user_id, plan, expires_at):
-    """Generate a license key for downloadable version"""
+    """Generate a license key for downloadable version (stable per user, plan and expiry)"""
     # Create a unique license key based on user ID and plan
     license_key = f"OWAIKEN-{plan.upper()}-{user_id[:8]}-{uuid.uuid4().hex[:8]}"
     return license_key
 
+def _qr_payload(data):
+    """Encode a QR payload as canonical compact JSON (sorted keys, no spaces)"""
+    return json.dumps(data, separators=(",", ":"), sort_keys=True)
+
+@st.cache_data(max_entries=128, show_spinner=False)
 def generate_qr_code(data):
-    """Generate a QR code for the license key"""
+    """Generate an SVG QR code for the license key (memoized per payload across reruns)"""
+    # Only the SVG backend is used, so PIL is never loaded for QR codes
+    import qrcode
+    import qrcode.image.svg
+    
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -36,12 +60,12 @@ def generate_qr_code(data):
     qr.add_data(data)
     qr.make(fit=True)
     
-    img = qr.make_image(fill_color="black", back_color="white")
-    buffered = BytesIO()
-    img.save(buffered)
-    img_str = base64.b64encode(buffered.getvalue()).decode()
-    return img_str
+    # Vector output scales crisply and skips rasterizing and PNG encoding;
+    # the fill variant keeps the white background so the code scans on dark themes
+    img = qr.make_image(image_factory=qrcode.image.svg.SvgPathFillImage)
+    return img.to_string(encoding="unicode")
 
+@st.fragment
 def display_license_information(user, subscription):
     """Display license information for the user"""
     st.subheader("Your Owaiken License")
@@ -57,22 +81,25 @@ def display_license_information(user, subscription):
     license_key = st.session_state.license_key
     
     # Display license details
-    st.write(f"**License Type:** {subscription.get('plan').capitalize()}")
-    st.write(f"**Status:** {'Active' if subscription.get('status') == 'active' else 'Inactive'}")
-    st.write(f"**Expires:** {datetime.fromisoformat(subscription.get('expires_at')).strftime('%B %d, %Y')}")
+    # One markdown element instead of one per line
+    st.markdown(
+        f"**License Type:** {subscription.get('plan').capitalize()}\n\n"
+        f"**Status:** {'Active' if subscription.get('status') == 'active' else 'Inactive'}\n\n"
+        f"**Expires:** {_fmt_exp(subscription.get('expires_at'))}"
+    )
     
     # Display license key
     st.code(license_key, language=None)
     
     # Generate QR code for easy scanning
-    qr_code = generate_qr_code(json.dumps({
+    qr_svg = generate_qr_code(_qr_payload({
         "license_key": license_key,
         "user_id": user.get("id"),
         "plan": subscription.get("plan"),
         "expires_at": subscription.get("expires_at")
     }))
     
-    st.image(f"data:image/png;base64,{qr_code}", caption="Scan to activate desktop app")
+    st.image(qr_svg, caption="Scan to activate desktop app", width=300)
     
     # Download options
     st.subheader("Download Owaiken Desktop")
@@ -101,27 +128,23 @@ def display_license_information(user, subscription):
     
     # Installation instructions
     with st.expander("Installation Instructions"):
-        st.write("""
-        1. Download the installer for your operating system
-        2. Run the installer and follow the on-screen instructions
-        3. Launch Owaiken Desktop
-        4. When prompted, enter your license key or scan the QR code above
-        5. Enjoy all the features of Owaiken on your desktop!
-        """)
+        st.html(_INSTALL_HTML)
 
+@st.fragment
 def display_subscription_management(user, subscription):
     """Display subscription management options"""
     st.subheader("Manage Your Subscription")
     
     # Display current plan
-    st.write(f"**Current Plan:** {subscription.get('plan').capitalize()}")
-    st.write(f"**Status:** {'Active' if subscription.get('status') == 'active' else 'Inactive'}")
-    st.write(f"**Renewal Date:** {datetime.fromisoformat(subscription.get('expires_at')).strftime('%B %d, %Y')}")
+    st.markdown(
+        f"**Current Plan:** {subscription.get('plan').capitalize()}\n\n"
+        f"**Status:** {'Active' if subscription.get('status') == 'active' else 'Inactive'}\n\n"
+        f"**Renewal Date:** {_fmt_exp(subscription.get('expires_at'))}"
+    )
     
     # Plan upgrade/downgrade options
     if subscription.get("plan") == "monthly":
-        st.write("### Upgrade to Annual Plan")
-        st.write("Save 16% by switching to our annual plan!")
+        st.markdown("### Upgrade to Annual Plan\n\nSave 16% by switching to our annual plan!")
         
         if st.button("Upgrade to Annual Plan"):
             # In demo mode, create a new annual subscription
@@ -138,8 +161,7 @@ def display_subscription_management(user, subscription):
                 st.rerun()
     
     elif subscription.get("plan") == "annual":
-        st.write("### Switch to Monthly Plan")
-        st.write("You're currently on our best value plan!")
+        st.markdown("### Switch to Monthly Plan\n\nYou're currently on our best value plan!")
         
         if st.button("Switch to Monthly Plan"):
             # In demo mode, create a new monthly subscription
@@ -157,7 +179,7 @@ def display_subscription_management(user, subscription):
     
     # Cancellation option
     with st.expander("Cancel Subscription"):
-        st.write("We're sorry to see you go! Your subscription will remain active until the end of your billing period.")
+        st.text("We're sorry to see you go! Your subscription will remain active until the end of your billing period.")
         
         if st.button("Cancel Subscription", key="cancel_subscription"):
             # In demo mode, just mark the subscription as cancelled
@@ -170,10 +192,11 @@ def subscription_tab(user):
     st.title("Owaiken Subscription")
     
     # Check if user has a subscription
-    subscription = check_subscription(user.get("id"))
+    subscription = cached_check_subscription(user.get("id"))
     
     if subscription:
-        # User has an active subscription
+        # User has an active subscription; each tab is a fragment, so
+        # interacting with one does not rerun the other
         tab1, tab2 = st.tabs(["License Information", "Manage Subscription"])
         
         with tab1:
@@ -183,8 +206,10 @@ def subscription_tab(user):
             display_subscription_management(user, subscription)
     else:
         # User doesn't have a subscription
-        st.write("### Get Started with Owaiken")
-        st.write("Choose a subscription plan to access all features of Owaiken, including the desktop application.")
+        st.markdown(
+            "### Get Started with Owaiken\n\n"
+            "Choose a subscription plan to access all features of Owaiken, including the desktop application."
+        )
         
         display_subscription_ui(user)
 
@@ -197,5 +222,5 @@ def subscription_page():
         subscription_tab(user)
     else:
         st.title("Owaiken Subscription")
-        st.write("Please log in to manage your subscription.")
+        st.text("Please log in to manage your subscription.")
         display_login_ui()
@@ -13,19 +13,14 @@ def theme_selector():
         with col1:
             if st.button("🌞 Light", use_container_width=True):
                 st.session_state.theme = "light"
-                st.experimental_set_query_params(
-                    theme="light",
-                    **{k: v for k, v in st.experimental_get_query_params().items() if k != "theme"}
-                )
+                # Setting one key keeps the other query params as they are
+                st.query_params["theme"] = "light"
                 st.rerun()
                 
         with col2:
             if st.button("🌙 Dark", use_container_width=True):
                 st.session_state.theme = "dark"
-                st.experimental_set_query_params(
-                    theme="dark", 
-                    **{k: v for k, v in st.experimental_get_query_params().items() if k != "theme"}
-                )
+                st.query_params["theme"] = "dark"
                 st.rerun()
                 
     # Display current theme
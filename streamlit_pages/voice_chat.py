@@ -4,57 +4,13 @@ Voice chat functionality for Owaiken
 import streamlit as st
 import json
 import base64
+import hashlib
 import time
 from datetime import datetime
 from streamlit_pages.speech_recognition_service import get_speech_recognition_service
 
-def init_voice_chat():
-    """
-    Initialize voice chat functionality in session state
-    """
-    if 'voice_recording' not in st.session_state:
-        st.session_state.voice_recording = False
-    
-    if 'voice_data' not in st.session_state:
-        st.session_state.voice_data = None
-
-def toggle_recording():
-    """
-    Toggle voice recording state
-    """
-    st.session_state.voice_recording = not st.session_state.voice_recording
-    
-    # Reset voice data when starting a new recording
-    if st.session_state.voice_recording:
-        st.session_state.voice_data = None
-
-def process_audio_data(audio_data):
-    """
-    Process the received audio data
-    Returns the transcribed text
-    """
-    # Get speech recognition service
-    speech_service = get_speech_recognition_service()
-    
-    try:
-        # Use the real transcription service if API key is available
-        if speech_service.api_key:
-            transcription = speech_service.transcribe_audio_data(audio_data)
-        else:
-            # Fall back to simulation if no API key
-            transcription = speech_service.simulate_transcription(3.0)  # Use default duration
-            
-        return transcription
-    except Exception as e:
-        st.error(f"Error processing audio: {str(e)}")
-        return "Error processing audio. Using simulated response instead."
-
-def voice_recorder_component():
-    """
-    Create a voice recorder component using HTML/JS
-    """
-    # JavaScript for recording audio
-    recorder_js = """
+# JavaScript for recording audio
+_RECORDER_JS = """
     const recordButton = document.getElementById('voice-record-button');
     const recordingIndicator = document.getElementById('recording-indicator');
     const voiceWaves = document.getElementById('voice-waves');
@@ -112,8 +68,8 @@ def voice_recorder_component():
                 stream.getTracks().forEach(track => track.stop());
             });
             
-            // Start recording
-            mediaRecorder.start();
+            // Start recording; a 250 ms timeslice keeps each buffered chunk small
+            mediaRecorder.start(250);
             isRecording = true;
             recordButton.classList.add('recording');
             recordingIndicator.style.display = 'block';
@@ -142,9 +98,9 @@ def voice_recorder_component():
         }
     });
     """
-    
-    # HTML for the voice recorder
-    recorder_html = """
+
+# HTML for the voice recorder, assembled once so every rerun sends the same string
+_RECORDER_HTML = """
     <div class="voice-recorder-container">
         <button id="voice-record-button" class="openmanus-voice-button">
             <svg width="24" height="24" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
@@ -163,12 +119,65 @@ def voice_recorder_component():
     </div>
     
     <script>
-    """ + recorder_js + """
+    """ + _RECORDER_JS + """
     </script>
     """
+
+def init_voice_chat():
+    """
+    Initialize voice chat functionality in session state
+    """
+    if 'voice_recording' not in st.session_state:
+        st.session_state.voice_recording = False
+    
+    if 'voice_data' not in st.session_state:
+        st.session_state.voice_data = None
+
+def toggle_recording():
+    """
+    Toggle voice recording state
+    """
+    st.session_state.voice_recording = not st.session_state.voice_recording
+    
+    # Reset voice data when starting a new recording
+    if st.session_state.voice_recording:
+        st.session_state.voice_data = None
+
+def process_audio_data(audio_data):
+    """
+    Process the received audio data (base64 encoded)
+    Returns the transcribed text
+    """
+    return process_audio_bytes(base64.b64decode(audio_data))
+
+def process_audio_bytes(audio_bytes):
+    """
+    Process the received raw audio bytes
+    Returns the transcribed text
+    """
+    # Get speech recognition service
+    speech_service = get_speech_recognition_service()
     
+    try:
+        # Use the real transcription service if API key is available
+        # (it caches transcripts by audio hash, so a repeated clip skips the API)
+        if speech_service.api_key:
+            transcription = speech_service.transcribe_audio_bytes(audio_bytes)
+        else:
+            # Fall back to simulation if no API key
+            transcription = speech_service.simulate_transcription(3.0)  # Use default duration
+            
+        return transcription
+    except Exception as e:
+        st.error(f"Error processing audio: {str(e)}")
+        return "Error processing audio. Using simulated response instead."
+
+def voice_recorder_component():
+    """
+    Create a voice recorder component using HTML/JS
+    """
     # Render the HTML component
-    st.components.v1.html(recorder_html, height=100)
+    st.components.v1.html(_RECORDER_HTML, height=100)
     
     # Handle messages from the component
     if st.session_state.voice_recording:
@@ -176,15 +185,23 @@ def voice_recorder_component():
     
     # Process received audio data
     if st.session_state.voice_data:
+        # Skip a recording that was already processed (e.g. the same message delivered again)
+        voice_data = st.session_state.voice_data
+        audio_sha = hashlib.sha256(voice_data.encode() if isinstance(voice_data, str) else voice_data).hexdigest()
+        if st.session_state.get("_last_audio_sha") == audio_sha:
+            st.session_state.voice_data = None
+            return None
+        st.session_state._last_audio_sha = audio_sha
+        
         try:
-            audio_data = st.session_state.voice_data
-            transcription = process_audio_data(audio_data)
+            # Decode once; the same bytes feed transcription and playback
+            audio_bytes = base64.b64decode(voice_data)
+            transcription = process_audio_bytes(audio_bytes)
             
             # Display the transcription
             st.markdown(f"**Transcription:** {transcription}")
             
             # Create audio playback
-            audio_bytes = base64.b64decode(audio_data)
             st.audio(audio_bytes, format="audio/wav")
             
             # Reset voice data after processing
@@ -1,7 +1,6 @@
 from __future__ import annotations
 from dotenv import load_dotenv
 import streamlit as st
-import logfire
 import asyncio
 import os
 import secrets
@@ -23,28 +22,15 @@ except:
     )
 
 # Utilities and styles
-from utils.utils import get_clients
+from utils.utils import get_clients, workbench_dir
 from streamlit_pages.styles import load_css
 from streamlit_pages.sidebar_theme import apply_sidebar_theme
 from streamlit_pages.green_to_blue import change_green_to_blue
 from streamlit_pages.direct_css_override import apply_direct_css_override
 
-# Streamlit pages
-from streamlit_pages.intro import intro_tab
-from streamlit_pages.chat import chat_tab
-from streamlit_pages.environment import environment_tab
-from streamlit_pages.database import database_tab
-from streamlit_pages.documentation import documentation_tab
-from streamlit_pages.agent_service import agent_service_tab
-from streamlit_pages.mcp import mcp_tab
-from streamlit_pages.future_enhancements import future_enhancements_tab
-from streamlit_pages.license import license_tab
+# Streamlit pages used on every run; the tab pages are imported in main()
+# when selected, so a run only loads the page it renders
 from streamlit_pages.theme_selector import theme_selector
-from streamlit_pages.ui_components import ui_components_tab
-from streamlit_pages.n8n_integration import n8n_integration_tab, n8n_knowledge_base
-from streamlit_pages.logo_uploader import logo_uploader_tab
-from streamlit_pages.openmanus_integration import openmanus_tab as owaiken_os_tab
-from streamlit_pages.subscription_management import subscription_page
 from streamlit_pages.auth_system import initialize_auth_system, get_current_user
 
 # Load environment variables from .env file
@@ -94,8 +80,21 @@ try:
 except Exception as e:
     print(f"Warning: Could not create secrets file: {type(e).__name__}")
 
-# Initialize clients safely
-try:
+def _env_vars_mtime():
+    """Modification time of the saved environment variables (None if nothing is saved yet)"""
+    try:
+        return os.stat(os.path.join(workbench_dir, "env_vars.json")).st_mtime_ns
+    except OSError:
+        return None
+
+@st.cache_resource(max_entries=1)
+def _cached_clients(env_vars_mtime):
+    """
+    Create the API clients once and share them across sessions and reruns
+    
+    env_vars_mtime is only part of the cache key, so saving new settings in
+    the Environment tab creates fresh clients on the next run.
+    """
     # First try the standard method
     openai_client, supabase = get_clients()
     
@@ -108,7 +107,12 @@ try:
                 print("Successfully connected to Supabase using direct connector")
         except Exception as e:
             print(f"Direct Supabase connection failed: {str(e)}")
-            
+    
+    return openai_client, supabase
+
+# Initialize clients safely
+try:
+    openai_client, supabase = _cached_clients(_env_vars_mtime())
 except Exception as e:
     st.warning(f"Warning: Could not initialize some clients. Error: {str(e)}")
     openai_client, supabase = None, None
@@ -125,8 +129,15 @@ change_green_to_blue()
 # Apply direct CSS override
 apply_direct_css_override()
 
-# Configure logfire to suppress warnings (optional)
-logfire.configure(send_to_logfire='never')
+@st.cache_resource
+def _configure_logfire():
+    """Configure logfire once per process"""
+    import logfire
+    
+    # Configure logfire to suppress warnings (optional)
+    logfire.configure(send_to_logfire='never')
+
+_configure_logfire()
 
 async def main():
     try:
@@ -164,48 +175,25 @@ async def main():
 
         # Add sidebar navigation
         with st.sidebar:
-            # Check if logo files exist in the public directory
-            import os
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            public_dir = os.path.join(current_dir, "public")
-            
-            light_logo_path = None
-            dark_logo_path = None
-            
-            # Check for SVG logos first
-            if os.path.exists(os.path.join(public_dir, "Owaiken_Black.svg")):
-                light_logo_path = os.path.join(public_dir, "Owaiken_Black.svg")
-            elif os.path.exists(os.path.join(public_dir, "Owaiken_Black.png")):
-                light_logo_path = os.path.join(public_dir, "Owaiken_Black.png")
-                
-            if os.path.exists(os.path.join(public_dir, "Owaiken_White.svg")):
-                dark_logo_path = os.path.join(public_dir, "Owaiken_White.svg")
-            elif os.path.exists(os.path.join(public_dir, "Owaiken_White.png")):
-                dark_logo_path = os.path.join(public_dir, "Owaiken_White.png")
+            # Find the logo files in the public directory (cached; cleared when a logo is saved)
+            from streamlit_pages.logo_handler import display_logo, resolve_logo_paths
+            public_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "public")
+            light_logo_path, dark_logo_path = resolve_logo_paths(public_dir)
             
             # Display the appropriate logo based on the current theme
             if st.get_option("theme.base") == "light":
-                if light_logo_path and os.path.getsize(light_logo_path) > 10:  # Make sure file is not empty
-                    try:
-                        st.image(light_logo_path, width=250)
-                    except Exception as e:
-                        st.error(f"Error loading logo: {str(e)}")
-                        from streamlit_pages.logo_handler import display_logo
-                        display_logo(logo_type="light")
-                else:
-                    from streamlit_pages.logo_handler import display_logo
-                    display_logo(logo_type="light")
+                logo_type, logo_path = "light", light_logo_path
+            else:
+                logo_type, logo_path = "dark", dark_logo_path
+            
+            if logo_path:
+                try:
+                    st.image(logo_path, width=250)
+                except Exception as e:
+                    st.error(f"Error loading logo: {str(e)}")
+                    display_logo(logo_type=logo_type)
             else:
-                if dark_logo_path and os.path.getsize(dark_logo_path) > 10:  # Make sure file is not empty
-                    try:
-                        st.image(dark_logo_path, width=250)
-                    except Exception as e:
-                        st.error(f"Error loading logo: {str(e)}")
-                        from streamlit_pages.logo_handler import display_logo
-                        display_logo(logo_type="dark")
-                else:
-                    from streamlit_pages.logo_handler import display_logo
-                    display_logo(logo_type="dark")
+                display_logo(logo_type=logo_type)
                 
             # Add theme selector
             with st.expander("Theme Settings"):
@@ -280,6 +268,7 @@ async def main():
         # Display the selected tab - allow access to all features for development/testing
         if st.session_state.selected_tab == "License":
             st.title("Owaiken - License Management")
+            from streamlit_pages.license import license_tab
             license_tab()
             # Check if license was just validated
             if st.session_state.get("license_valid", False) != license_valid:
@@ -287,45 +276,59 @@ async def main():
                 st.rerun()
         elif st.session_state.selected_tab == "Intro":
             st.title("Owaiken - Introduction")
+            from streamlit_pages.intro import intro_tab
             intro_tab()
         elif st.session_state.selected_tab == "Chat":
             st.title("Owaiken - Agent Builder")
+            from streamlit_pages.chat import chat_tab
             await chat_tab()
         elif st.session_state.selected_tab == "MCP":
             st.title("Owaiken - MCP Configuration")
+            from streamlit_pages.mcp import mcp_tab
             mcp_tab()
         elif st.session_state.selected_tab == "Environment":
             st.title("Owaiken - Environment Configuration")
+            from streamlit_pages.environment import environment_tab
             environment_tab()
         elif st.session_state.selected_tab == "Agent Service":
             st.title("Owaiken - Agent Service")
+            from streamlit_pages.agent_service import agent_service_tab
             agent_service_tab()
         elif st.session_state.selected_tab == "Database":
             st.title("Owaiken - Database Configuration")
+            from streamlit_pages.database import database_tab
             database_tab(supabase)
         elif st.session_state.selected_tab == "Documentation":
             st.title("Owaiken - Documentation")
+            from streamlit_pages.documentation import documentation_tab
             documentation_tab(supabase)
         elif st.session_state.selected_tab == "UI Components":
             st.title("Owaiken - UI Components")
+            from streamlit_pages.ui_components import ui_components_tab
             ui_components_tab()
         elif st.session_state.selected_tab == "Future Enhancements":
             st.title("Owaiken - Future Enhancements")
+            from streamlit_pages.future_enhancements import future_enhancements_tab
             future_enhancements_tab()
         elif st.session_state.selected_tab == "N8N Integration":
             st.title("Owaiken - N8N Workflow Integration")
+            from streamlit_pages.n8n_integration import n8n_integration_tab
             n8n_integration_tab()
         elif st.session_state.selected_tab == "N8N Knowledge Base":
             st.title("Owaiken - N8N Knowledge Base")
+            from streamlit_pages.n8n_integration import n8n_knowledge_base
             n8n_knowledge_base()
         elif st.session_state.selected_tab == "Owaiken OS":
             st.title("Owaiken OS")
+            from streamlit_pages.openmanus_integration import openmanus_tab as owaiken_os_tab
             owaiken_os_tab()
         elif st.session_state.selected_tab == "Subscription":
             st.title("Owaiken - Subscription Management")
+            from streamlit_pages.subscription_management import subscription_page
             subscription_page()
         elif st.session_state.selected_tab == "Logo Uploader":
             st.title("Owaiken - Logo Uploader")
+            from streamlit_pages.logo_uploader import logo_uploader_tab
             logo_uploader_tab()
         
         # Add a gentle reminder if no license is present (instead of blocking access)
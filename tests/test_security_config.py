@@ -0,0 +1,98 @@
+"""
+Regression tests for SQL injection sanitization in security_config
+"""
+import re
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("supabase")
+
+from streamlit_pages.security_config import SecureQueryBuilder, sanitize_input
+
+# The original sequential implementation, kept as the reference behaviour
+_LEGACY_PATTERNS = [
+    r"--",
+    r";",
+    r"\/\*.*?\*\/",
+    r"DROP\s+TABLE",
+    r"DELETE\s+FROM",
+    r"INSERT\s+INTO",
+    r"UPDATE\s+",
+    r"UNION\s+SELECT",
+    r"SELECT\s+",
+    r"ALTER\s+TABLE",
+    r"EXEC\s+",
+    r"EXECUTE\s+",
+]
+
+def _legacy_sanitize(value):
+    """Apply each pattern in turn, as sanitize_input used to"""
+    for pattern in _LEGACY_PATTERNS:
+        value = re.sub(pattern, "", value, flags=re.IGNORECASE)
+    return value
+
+@pytest.mark.parametrize("value", [
+    "plain text",
+    "alice@example.com",
+    "1; DROP TABLE users",
+    "x' OR 1=1 --",
+    "/* comment */ SELECT * FROM x",
+    "UNION SELECT password FROM users",
+    "update   profiles set",
+    "EXECUTE sp_who; EXEC xp_cmdshell",
+    # Removing ';' or '--' joins the pieces of a keyword
+    "SEL;ECT * FROM x",
+    "DR--OP TABLE users",
+    "DEL;ETE FROM x",
+    "UNI--ON SELECT 1",
+])
+def test_sanitize_input_matches_legacy_output(value):
+    assert sanitize_input(value) == _legacy_sanitize(value)
+
+def test_sanitize_input_removes_keywords_rejoined_by_earlier_removals():
+    assert sanitize_input("SEL;ECT * FROM x") == "* FROM x"
+    assert sanitize_input("DR--OP TABLE users") == " users"
+
+def test_sanitize_input_leaves_no_match():
+    # A removal that forms another keyword is removed as well
+    assert sanitize_input("SELSELECT ECT x") == "x"
+    assert sanitize_input("-;-ON") == "ON"
+
+@pytest.mark.parametrize("value, expected", [
+    # U+017F LATIN SMALL LETTER LONG S matches "S" under re.IGNORECASE
+    ("\u017felect * from x", "* from x"),
+    ("\u017fELECT password", "password"),
+])
+def test_sanitize_input_fast_path_handles_unicode_case_variants(value, expected):
+    assert sanitize_input(value) == expected == _legacy_sanitize(value)
+
+def test_sanitize_input_converts_non_strings():
+    assert sanitize_input(42) == "42"
+
+class _FakeQuery:
+    """Records the columns passed to select"""
+
+    def __init__(self):
+        self.selected = None
+
+    def select(self, columns):
+        self.selected = columns
+        return self
+
+class _FakeClient:
+    """Minimal stand-in for the Supabase client's table()"""
+
+    def table(self, name):
+        return _FakeQuery()
+
+def test_query_builder_rejects_unknown_table():
+    with pytest.raises(ValueError, match="Unknown table: profiles"):
+        SecureQueryBuilder(_FakeClient(), "profiles")
+
+def test_query_builder_select_checks_comma_separated_columns():
+    builder = SecureQueryBuilder(_FakeClient(), "subscriptions").select("id, plan,status")
+    assert builder.query.selected == "id,plan,status"
+
+    with pytest.raises(ValueError, match="Unknown column for subscriptions: secret"):
+        SecureQueryBuilder(_FakeClient(), "subscriptions").select("id,secret")
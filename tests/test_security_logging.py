@@ -0,0 +1,77 @@
+"""
+Tests for the background threads and output handlers of security_logging
+"""
+import logging
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("msgspec")
+
+from streamlit_pages.security_logging import (
+    BatchAppendHandler,
+    SecurityEventType,
+    SecurityLogger,
+    SecuritySeverity,
+)
+
+def _make_logger(log_dir):
+    """A file-only logger writing into log_dir"""
+    return SecurityLogger(
+        app_name="test",
+        log_to_console=False,
+        log_dir=str(log_dir)
+    )
+
+def _log_lines(log_dir):
+    """All lines written to the log files in log_dir"""
+    return [
+        line
+        for path in sorted(log_dir.iterdir())
+        for line in path.read_text().splitlines()
+    ]
+
+def test_flush_writes_queued_events_to_file(tmp_path):
+    logger = _make_logger(tmp_path)
+    try:
+        for i in range(50):
+            logger.log_security_event(
+                SecurityEventType.ADMIN_ACTION,
+                severity=SecuritySeverity.LOW,
+                details={"i": i}
+            )
+
+        assert logger.flush()
+        assert len(_log_lines(tmp_path)) == 50
+    finally:
+        logger.close()
+
+def test_flush_then_close_leaves_no_threads(tmp_path):
+    before = set(threading.enumerate())
+
+    logger = _make_logger(tmp_path)
+    logger.log_security_event(SecurityEventType.ADMIN_ACTION, severity=SecuritySeverity.LOW)
+    assert logger.flush()
+    # Flushing must not start or leak listener threads
+    assert logger.flush()
+    logger.close()
+
+    assert set(threading.enumerate()) - before == set()
+    assert len(_log_lines(tmp_path)) == 1
+
+def test_file_handler_opens_a_new_file_each_day(tmp_path):
+    handler = BatchAppendHandler(str(tmp_path / "security_%Y%m%d.log"))
+    now = time.time()
+    tomorrow = now + 86400
+    try:
+        for created, msg in ((now, "today"), (tomorrow, "tomorrow")):
+            handler.emit(logging.makeLogRecord({"msg": msg, "created": created}))
+    finally:
+        handler.close()
+
+    today_file = tmp_path / time.strftime("security_%Y%m%d.log", time.localtime(now))
+    tomorrow_file = tmp_path / time.strftime("security_%Y%m%d.log", time.localtime(tomorrow))
+    assert today_file.read_text() == "today\n"
+    assert tomorrow_file.read_text() == "tomorrow\n"